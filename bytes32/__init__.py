@@ -2,5 +2,6 @@ from bytes32.version import __version__
 
 from bytes32.validity import check_validity
 from bytes32.winnability.language_agent import check_winnability
+from bytes32.winnability.solver import check_winnability_by_search
 from bytes32.compliance import check_compliance
 from bytes32.alignment import check_alignment
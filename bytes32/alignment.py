@@ -13,7 +13,14 @@ from tqdm import tqdm
 
 from bytes32.utils import batched
 from bytes32.utils import llm_gpt, stream_llm_gpt
+from data.library.GameBasic import TextGame
+from data.library.GameEngine import FrozenState
 
+from bytes32.sandbox import run_in_sandbox, STATUS_OK, STATUS_TIMEOUT, STATUS_OUT_OF_MEMORY
+
+# The default limits of the worker process that checks a game (the paths are judged by an LLM, one batch at a time)
+DEFAULT_TIME_LIMIT = 60 * 60        # 1 hour
+DEFAULT_MEMORY_LIMIT_MB = 4096
 
 NEGATIVE_RESPONSE_PHRASES = ["you can't", "you cannot", "not possible", "impossible", "error", "invalid"]
 
@@ -29,7 +36,8 @@ Here is an example output format: {"idx: 0, "evaluation":"no", "short_justificat
 # Class for the pathcrawler
 class Pathcrawler():
     # Constructor
-    def __init__(self, GameClass, tqdm_desc="Crawling paths", error_strategy="raise", random_seed=0, shuffle_random_seed=0):
+    def __init__(self, GameClass, tqdm_desc="Crawling paths", error_strategy="raise", random_seed=0, shuffle_random_seed=0,
+                 skip_transpositions=False):
         self.tqdm_desc = tqdm_desc
         self.error_strategy = error_strategy
         self.randomSeed = random_seed
@@ -40,6 +48,37 @@ class Pathcrawler():
         self.numPathsCrawled = 0
         self.pbar = None
 
+        # Optionally, don't crawl below a state that was already crawled below by a different path (e.g. "open fridge,
+        # take milk" and "take milk, open fridge"), since the paths below it would be the same.
+        self.skipTranspositions = skip_transpositions
+        self.crawledStates = set()
+        self.lastStateFingerprint = None
+
+        # Every path is replayed from the start, so the same observations come up again and again (e.g. the initial
+        # observation, in every path).  Each distinct observation string is stored once, and shared by all the paths.
+        self.observationStrs = {}
+
+        # Every path starts from the same initial state (with its possible actions listed), which is frozen once and
+        # copied for each path.  Every node of the crawl lists the possible actions of that state, so it's only run once.
+        self.initialState = None
+        self.initialRun = None
+
+    # Make a game in its initial state, with its possible actions listed.  Games that use the library's reset() are
+    # copied from a frozen initial state, which is quicker than initializing a new game (and listing its actions) for
+    # every path.
+    def newGame(self):
+        if getattr(self.GameClass, "reset", None) is not TextGame.reset:
+            game = self.GameClass(randomSeed = self.randomSeed)
+            game.generatePossibleActions()
+            return game
+
+        if self.initialState is None:
+            game = self.GameClass.__new__(self.GameClass)
+            game.reset(self.randomSeed)
+            game.generatePossibleActions()
+            self.initialState = FrozenState(game)
+        return self.initialState.thaw()
+
     def getGameTaskDescription(self):
         # Initialize the game
         game = self.GameClass(randomSeed = self.randomSeed)
@@ -48,6 +87,7 @@ class Pathcrawler():
     # Pack the game state into a dictionary
     def packGameState(self, actionStrTaken: str, observationStr: str,
                       numSteps: int, score: int, gameOver: bool, gameWon: bool):
+        observationStr = self.observationStrs.setdefault(observationStr, observationStr)
 
         packed = {
             "actionStrTaken": actionStrTaken,
@@ -61,20 +101,31 @@ class Pathcrawler():
 
         return packed
 
-    # Run the game, using a specific series of actions
-    def run(self, actionStrList:list):
+    # Run the game, using a specific series of actions.  If the states recorded when running all but the last action
+    # are given (e.g. by the parent path in the crawl), the game replays to the same states, so those actions are only
+    # stepped through (nobody reads their observations) and just the last action is recorded.
+    def run(self, actionStrList:list, prefixStates:list = None):
         out = []
         # Initialize the game
-        game = self.GameClass(randomSeed = self.randomSeed)
-        game.generatePossibleActions()
-
-        # Initial observation
-        out.append(self.packGameState(actionStrTaken = "",
-                                      observationStr=game.observationStr,
-                                      numSteps=game.numSteps,
-                                      score=game.score,
-                                      gameOver=game.gameOver,
-                                      gameWon=game.gameWon))
+        game = self.newGame()
+
+        if prefixStates is not None:
+            out.extend(prefixStates)
+            for actionStr in actionStrList[:-1]:
+                try:
+                    game.step(actionStr)
+                except Exception:
+                    # Already handled (per the error strategy) when the prefix states were recorded
+                    pass
+            actionStrList = actionStrList[-1:]
+        else:
+            # Initial observation
+            out.append(self.packGameState(actionStrTaken = "",
+                                          observationStr=game.observationStr,
+                                          numSteps=game.numSteps,
+                                          score=game.score,
+                                          gameOver=game.gameOver,
+                                          gameWon=game.gameWon))
 
         # Run the actions in the game
         for actionStr in actionStrList:
@@ -109,10 +160,17 @@ class Pathcrawler():
         # Also store final state
         #out.append(self.packGameState(game, ""))
 
+        # Identify the final state, for detecting transpositions (games that don't derive from TextGame can't be)
+        if self.skipTranspositions and hasattr(game, "stateFingerprint"):
+            self.lastStateFingerprint = game.stateFingerprint()
+        else:
+            self.lastStateFingerprint = None
+
         return out, game.generatePossibleActions().keys()
 
     # Crawl the game
-    def crawl(self, maxDepth:int = 3, maxPathsToCrawl:int = 1000, maxCrawlsPerAction:int = 10, actionsSoFar:list = []):
+    def crawl(self, maxDepth:int = 3, maxPathsToCrawl:int = 1000, maxCrawlsPerAction:int = 10, actionsSoFar:list = [],
+              statesSoFar:list = None):
         # Initialize the progress bar if it isn't already initialized
         if self.pbar is None:
             self.pbar = tqdm(total=maxPathsToCrawl, desc=self.tqdm_desc, file=sys.stdout)
@@ -123,8 +181,14 @@ class Pathcrawler():
         if (maxDepth < 0) or (self.numPathsCrawled >= maxPathsToCrawl):
             return out
 
-        # Run the game with the current actions, to get the list of possible next actions from this node
-        _, possibleActions = self.run([])
+        # Get the list of possible next actions from this node (those of the initial state)
+        if self.initialRun is None:
+            self.initialRun = self.run([])
+        initialStates, possibleActions = self.initialRun
+
+        # The starting state counts as crawled below
+        if (len(actionsSoFar) == 0) and (self.lastStateFingerprint is not None):
+            self.crawledStates.add(self.lastStateFingerprint)
 
         # Get the list of possible action verbs (i.e. the first token of each action string)
         #possibleActionVerbs = list(set([actionStr.split(" ")[0] for actionStr in possibleActions]))
@@ -152,7 +216,7 @@ class Pathcrawler():
 
             # Run the game with the current actions, plus the new action
             actionStrList = actionsSoFar + [actionStr]
-            gameStates, _ = self.run(actionStrList)
+            gameStates, _ = self.run(actionStrList, statesSoFar if actionsSoFar else initialStates)
 
             # Append the game states to the output
             out.append(gameStates)
@@ -166,9 +230,15 @@ class Pathcrawler():
             # Update the progress bar
             self.pbar.update(1)
 
+            # Don't recurse below a state that has already been crawled below
+            if self.lastStateFingerprint is not None:
+                if self.lastStateFingerprint in self.crawledStates:
+                    continue
+                self.crawledStates.add(self.lastStateFingerprint)
+
             # Otherwise, if the game isn't over, recurse
             if (len(gameStates) > 0) and (not gameStates[-1]["gameOver"]):
-                out.extend(self.crawl(maxDepth-1, maxPathsToCrawl, maxCrawlsPerAction, actionStrList))
+                out.extend(self.crawl(maxDepth-1, maxPathsToCrawl, maxCrawlsPerAction, actionStrList, gameStates))
 
         #print("Action verb counts: " + str(actionVerbCounts))
 
@@ -182,18 +252,25 @@ def extract_initial_action_token(action: str):
     '''
     return action.split(" ")[0].lower()
 
-import inspect
-def check_alignment(game_file, args):
-
-    metric = {
+def get_empty_metric():
+    """ The results of check_alignment() for a game that couldn't be checked """
+    return {
         "score": 0,
         "error_msg": "",
         "evaluations": [],
     }
 
+
+import inspect
+def run_alignment(game_file, args):
+    """ Run the alignment check of check_alignment() in the current process (without any limits) """
+    metric = get_empty_metric()
+
     game_name = os.path.basename(game_file)
 
     try:
+        if os.path.dirname(game_file) not in sys.path:
+            sys.path.append(os.path.dirname(game_file))
         TextGame = next(obj for name, obj in
                         inspect.getmembers(importlib.import_module(game_name[:-3]),
                                            inspect.isclass) if
@@ -212,7 +289,8 @@ def check_alignment(game_file, args):
     # Create the pathcrawler
     pathcrawler = Pathcrawler(TextGame, tqdm_desc=f"Crawling paths on {game_name}",
                                 error_strategy=args.error_strategy, random_seed=args.random_seed,
-                                shuffle_random_seed=args.shuffle_random_seed)
+                                shuffle_random_seed=args.shuffle_random_seed,
+                                skip_transpositions=args.skip_transpositions)
 
     # Crawl the game
     try:
@@ -330,3 +408,38 @@ def check_alignment(game_file, args):
     metric["score"] = sum(e['evaluation'].lower().strip().startswith('yes') for e in evaluations) / len(evaluations)
     metric["evaluations"] = evaluations
     return metric
+
+
+def check_alignment(game_file, args):
+    """ Check whether a game models the world sensibly, by crawling its action paths and having an LLM judge a sample
+        of them.
+
+        The check runs in a separate worker process, with hard limits on its wall-clock time (`args.alignment_timeout`
+        seconds) and memory (`args.alignment_memory_limit` MB), so that a game that gets stuck or runs away while it's
+        crawled can't block the evaluation: the worker is killed, and the game is reported as failing. How the worker
+        ended is recorded under "sandbox", as in check_validity(). """
+    time_limit = getattr(args, "alignment_timeout", DEFAULT_TIME_LIMIT)
+    memory_limit_mb = getattr(args, "alignment_memory_limit", DEFAULT_MEMORY_LIMIT_MB)
+
+    run = run_in_sandbox(run_alignment, (game_file, args), time_limit=time_limit, memory_limit_mb=memory_limit_mb)
+
+    if run["status"] == STATUS_OK:
+        metric = run["result"]
+    else:
+        metric = get_empty_metric()
+        if run["status"] == STATUS_TIMEOUT:
+            print("Alignment check timed out after " + str(time_limit) + " seconds.")
+            metric["error_msg"] = "Alignment check timed out after " + str(time_limit) + " seconds."
+        elif run["status"] == STATUS_OUT_OF_MEMORY:
+            print("Alignment check ran out of memory (" + str(memory_limit_mb) + " MB).")
+            metric["error_msg"] = "Alignment check ran out of memory (over " + str(memory_limit_mb) + " MB)."
+        else:
+            print("Alignment check failed: " + run["error_msg"])
+            metric["error_msg"] = run["error_msg"]
+
+    metric["sandbox"] = {
+        "status": run["status"],
+        "time_limit": time_limit,
+        "memory_limit_mb": memory_limit_mb,
+    }
+    return metric
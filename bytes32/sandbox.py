@@ -0,0 +1,115 @@
+import sys
+import time
+import signal
+import resource
+import traceback
+import multiprocessing
+
+
+# The statuses of a sandboxed run
+STATUS_OK = "ok"
+STATUS_ERROR = "error"                  # The function raised an exception
+STATUS_TIMEOUT = "timeout"              # The wall-clock (or CPU time) limit was reached, and the worker was killed
+STATUS_OUT_OF_MEMORY = "out_of_memory"  # The memory limit was reached
+STATUS_CRASHED = "crashed"              # The worker died without reporting back (e.g. killed by a signal)
+
+
+def _set_memory_limit(memory_limit_mb):
+    """ Limit the address space of the current process, so that allocating past it raises a MemoryError. (The RSS
+        limit, RLIMIT_RSS, isn't enforced by Linux, and the address space is an upper bound on the RSS.) """
+    limit = int(memory_limit_mb * 1024 * 1024)
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _set_cpu_limit(time_limit):
+    """ Limit the CPU time of the current process (a backstop to the wall-clock limit, in case the worker can't be
+        killed in time): past it, the worker gets a SIGXCPU, and then a SIGKILL one second later. """
+    limit = int(time_limit) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+
+
+def _worker(conn, func, args, kwargs, time_limit, memory_limit_mb):
+    """ Runs in the worker process: set the limits, call the function, and send back (status, result, error_msg) """
+    try:
+        if memory_limit_mb:
+            _set_memory_limit(memory_limit_mb)
+        if time_limit:
+            _set_cpu_limit(time_limit)
+        result = func(*args, **kwargs)
+        message = (STATUS_OK, result, "")
+    except MemoryError:
+        message = (STATUS_OUT_OF_MEMORY, None, f"Exceeded the memory limit of {memory_limit_mb} MB.")
+    except (Exception, KeyboardInterrupt, SystemExit) as e:
+        message = (STATUS_ERROR, None, "".join(traceback.format_exception(type(e), e, e.__traceback__)))
+
+    try:
+        conn.send(message)
+    except MemoryError:
+        conn.send((STATUS_OUT_OF_MEMORY, None, f"Exceeded the memory limit of {memory_limit_mb} MB."))
+    except Exception as e:
+        # E.g. a result that can't be pickled
+        conn.send((STATUS_ERROR, None, f"Couldn't send the result back: {e}"))
+    finally:
+        conn.close()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def run_in_sandbox(func, args=(), kwargs=None, time_limit=None, memory_limit_mb=None):
+    """ Run `func(*args, **kwargs)` in a separate worker process, with a hard wall-clock limit (`time_limit`, in
+        seconds) and memory limit (`memory_limit_mb`, in megabytes), so that a stuck or runaway function can't block or
+        take down the caller. A worker that breaches a limit is killed. `func` and its arguments must be picklable.
+
+        Returns a dictionary with the "status" of the run (one of the STATUS_* above), the "result" of the function
+        (None unless the status is "ok"), an "error_msg", and the wall-clock "seconds" the run took. """
+    kwargs = kwargs or {}
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    worker = multiprocessing.Process(target=_worker, args=(sender, func, args, kwargs, time_limit, memory_limit_mb),
+                                     daemon=True)
+
+    start = time.perf_counter()
+    worker.start()
+    sender.close()      # So that receiving fails (rather than hangs) if the worker dies without sending anything
+
+    status, result, error_msg = None, None, ""
+    # The result is received before joining the worker (which can't exit until the pipe has been read)
+    if receiver.poll(time_limit):
+        try:
+            status, result, error_msg = receiver.recv()
+        except EOFError:
+            pass
+    else:
+        status = STATUS_TIMEOUT
+        error_msg = f"Timed out after {time_limit} seconds."
+    seconds = time.perf_counter() - start
+    receiver.close()
+
+    if status == STATUS_TIMEOUT:
+        worker.kill()
+    worker.join(5)
+    if worker.is_alive():
+        worker.kill()
+        worker.join()
+
+    if status is None:
+        # The worker died without reporting back
+        exitcode = worker.exitcode
+        if exitcode == -signal.SIGXCPU:
+            status, error_msg = STATUS_TIMEOUT, f"Timed out after {time_limit} seconds."
+        elif exitcode is not None and exitcode < 0:
+            status, error_msg = STATUS_CRASHED, f"The worker was killed by {signal.Signals(-exitcode).name}."
+        else:
+            status, error_msg = STATUS_CRASHED, f"The worker exited with code {exitcode} without a result."
+
+    return {
+        "status": status,
+        "result": result,
+        "error_msg": error_msg,
+        "seconds": seconds,
+    }
@@ -153,6 +153,16 @@ def get_empty_metrics():
             "calculateScore": False,
             "num_valid_actions": 0,
             "error_msg": '',
+            "search": {
+                "num_nodes": 0,
+                "num_pruned": 0,
+                "num_no_ops_skipped": 0,
+            },
+            "sandbox": {
+                "status": "",
+                "time_limit": 0,
+                "memory_limit_mb": 0,
+            },
         },
         "compliance": {
             "fold": "",
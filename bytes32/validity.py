@@ -5,61 +5,59 @@ import importlib
 import traceback
 import inspect
 
-import signal
-import random
-from contextlib import contextmanager
+from data.library.GameBasic import TextGame as LibraryTextGame
+from data.library.GameEngine import FrozenState, holdsBoundClosures
+
+from bytes32.sandbox import run_in_sandbox, STATUS_OK, STATUS_ERROR, STATUS_TIMEOUT, STATUS_OUT_OF_MEMORY
 
 # Keep track of special errors
 timeoutErrors = []
 
-# @contextmanager
-# def timeout(time):
-#     # Ref: https://www.jujens.eu/posts/en/2018/Jun/02/python-timeout-function/
-#     # Register a function to raise a TimeoutError on the signal.
-#     signal.signal(signal.SIGALRM, raise_timeout)
-#     # Schedule the signal to be sent after ``time``.
-#     signal.alarm(time)
-#
-#     try:
-#         yield
-#     except (TimeoutError, KeyboardInterrupt):
-#         pass
-#     finally:
-#         # Unregister the signal so it won't be triggered
-#         # if the timeout is not reached.
-#         signal.signal(signal.SIGALRM, signal.SIG_IGN)
-from contextlib import contextmanager
-from multiprocessing import Process, Queue
-import time
-
-class TimeoutException(Exception):
-    """Custom exception to indicate a timeout occurred."""
-    pass
-@contextmanager
-def timeout(seconds, func=None, args=(), kwargs={}):
-    """
-    Run a function with timeout. If `func` is None, it just runs the context block.
-    """
-    if func:
-        q = Queue()
-        p = Process(target=lambda q, *a, **kw: q.put(func(*a, **kw)), args=(q, *args), kwargs=kwargs)
-        p.start()
-        p.join(seconds)
-        if p.is_alive():
-            p.terminate()
-            raise TimeoutException("Function timed out")
-        yield q.get()
-    else:
-        # Dummy block timeout context (fallback)
-        start = time.time()
-        yield
-        if time.time() - start > seconds:
-            raise TimeoutException("Block execution timed out")
+# The default limits of the worker process that checks a game
+DEFAULT_TIME_LIMIT = 15 * 60        # 15 minutes
+DEFAULT_MEMORY_LIMIT_MB = 4096
+
+
+class FrontierStates():
+    """ Keeps the states of search nodes whose children are still to be searched, so that a child can be reached by
+        taking its last action from its parent's state, rather than by replaying its whole action sequence from a new
+        game. A state is dropped once its last child is taken from it. At most `max_states` are kept at once; past
+        that, save() returns None, and the children are replayed. Which states are saved only depends on this count
+        (not on timings), so a search takes the same course on every run. """
+
+    def __init__(self, max_states):
+        self.max_states = max_states
+        self.num_children = {}      # saved state -> the number of its children still to be searched
+
+    def save(self, game):
+        """ Save the current state of a game, to take its children from. Returns the state (or None, when full). """
+        if len(self.num_children) >= self.max_states:
+            return None
+        state = FrozenState(game)
+        self.num_children[state] = 0
+        return state
 
+    def set_num_children(self, state, num_children):
+        """ Set how many children will be taken from a saved state (if any) """
+        if state is None:
+            return
+        if num_children > 0:
+            self.num_children[state] = num_children
+        else:
+            del self.num_children[state]
+
+    def skip(self, state):
+        """ Skip one of the children of a saved state (if any), without restoring it """
+        if state is None:
+            return
+        self.num_children[state] -= 1
+        if self.num_children[state] == 0:
+            del self.num_children[state]
 
-def raise_timeout(signum, frame):
-    print("Timeout")
-    raise TimeoutError
+    def restore(self, state):
+        """ Make a new game in a saved state, for one of its children """
+        self.skip(state)
+        return state.thaw()
 
 
 def sample_actions(possible_actions, max_num_actions, random_seed):
@@ -83,9 +81,9 @@ def sample_actions(possible_actions, max_num_actions, random_seed):
     return possible_actions_out
 
 
-def check_validity(gamefile, args):
-    """ Check the validty of a game: class, methods, scoring function, runnability."""
-    checks = {
+def get_empty_checks():
+    """ The results of check_validity() for a game that hasn't passed any check """
+    return {
         "TextGame": False,
         "runnable": False,
         "winnable": False,
@@ -95,121 +93,234 @@ def check_validity(gamefile, args):
         "calculateScore": False,
         "num_valid_actions": 0,
         "error_msg": '',
+        "search": {
+            "num_nodes": 0,             # action sequences played
+            "num_pruned": 0,            # nodes not expanded, since their state was already reached with as few actions
+            "num_no_ops_skipped": 0,    # nodes not played, since their last action was seen to change nothing
+        },
     }
 
-    timedOut = True
-    timeoutDuration = 15 * 60  # 15 minutes
-    with timeout(timeoutDuration):
-        try:
-            if os.path.dirname(gamefile) not in sys.path:
-                sys.path.append(os.path.dirname(gamefile))
-
-            # TextGame = importlib.import_module(os.path.basename(gamefile)[:-3]).TextGame
-            TextGame = next(obj for name, obj in
-                            inspect.getmembers(importlib.import_module(os.path.basename(gamefile)[:-3]),
-                                               inspect.isclass) if
-                            obj.__module__ == os.path.basename(gamefile)[:-3] and name.endswith('Game'))
-            print(gamefile)
-        except Exception as e:
-            print(e)
-            checks["error_msg"] = str(e)
-            return checks
 
-        try:
-            game = TextGame(randomSeed=args.random_seed)
-            checks['TextGame'] = True
-            print("-> Successfully initialized the game.")
-        except Exception as e:
-            print(e)
-            checks["error_msg"] = str(e)
-            return checks
+def run_checks(gamefile, args):
+    """ Run the checks of check_validity() in the current process (without any limits). A MemoryError isn't counted
+        as an error of the game, and is raised (for the sandbox to report the game as running out of memory). """
+    checks = get_empty_checks()
 
-        try:
-            task_desc = game.getTaskDescription()
-            checks["getTaskDescription"] = True
-            print(f"-> Task Description: {task_desc}")
-        except Exception as e:
-            print(e)
-            checks["error_msg"] = str(e)
-            return checks
+    try:
+        if os.path.dirname(gamefile) not in sys.path:
+            sys.path.append(os.path.dirname(gamefile))
 
-        try:
-            game.calculateScore()
-            checks["calculateScore"] = True
-            print("-> calculateScore() is implemented.")
-        except Exception as e:
-            print(e)
-            checks["error_msg"] = str(e)
-            return checks
+        # TextGame = importlib.import_module(os.path.basename(gamefile)[:-3]).TextGame
+        TextGame = next(obj for name, obj in
+                        inspect.getmembers(importlib.import_module(os.path.basename(gamefile)[:-3]),
+                                           inspect.isclass) if
+                        obj.__module__ == os.path.basename(gamefile)[:-3] and name.endswith('Game'))
+        print(gamefile)
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(e)
+        checks["error_msg"] = str(e)
+        return checks
 
-        try:
-            possible_actions = game.generatePossibleActions()
-            num_first_step_possible_actions = len(possible_actions)
-            checks["num_valid_actions"] = num_first_step_possible_actions
-            checks["generatePossibleActions"] = True
-            print("-> generatePossibleActions() is implemented.")
-        except Exception as e:
-            print(e)
-            checks["error_msg"] = str(e)
-            return checks
+    try:
+        game = TextGame(randomSeed=args.random_seed)
+        checks['TextGame'] = True
+        print("-> Successfully initialized the game.")
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(e)
+        checks["error_msg"] = str(e)
+        return checks
+
+    try:
+        task_desc = game.getTaskDescription()
+        checks["getTaskDescription"] = True
+        print(f"-> Task Description: {task_desc}")
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(e)
+        checks["error_msg"] = str(e)
+        return checks
+
+    try:
+        game.calculateScore()
+        checks["calculateScore"] = True
+        print("-> calculateScore() is implemented.")
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(e)
+        checks["error_msg"] = str(e)
+        return checks
 
-        # DFS search
-        action_stack = []
+    try:
+        possible_actions = game.generatePossibleActions()
+        num_first_step_possible_actions = len(possible_actions)
+        checks["num_valid_actions"] = num_first_step_possible_actions
+        checks["generatePossibleActions"] = True
+        print("-> generatePossibleActions() is implemented.")
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(e)
+        checks["error_msg"] = str(e)
+        return checks
+
+    # DFS search.  Every action sequence is played from a new game, with the possible actions listed once at the
+    # start.  Rather than replaying a whole sequence, a node is reached by taking its last action from its
+    # parent's state, which is kept (for games built on the library's TextGame) until its children are searched.
+    # Games whose state holds closures (e.g. lambdas that call the game's methods) are always replayed, since a
+    # closure in a saved state may still refer to the game it was saved from.
+    action_stack = []
+    frontier = FrontierStates(args.max_snapshots if issubclass(TextGame, LibraryTextGame) else 0)
+    root_state = None
+    if frontier.max_states > 0:
+        root_game = TextGame(randomSeed=args.random_seed)
+        root_game.generatePossibleActions()
+        if holdsBoundClosures(root_game):
+            frontier.max_states = 0
+        else:
+            root_state = frontier.save(root_game)
 
-        # truncate possible actions if the num of possible actions is too large
-        possible_actions = sample_actions(possible_actions, args.max_num_actions, args.random_seed)
-        for action in possible_actions:
-            action_stack.append([action])
+    # Optionally, states that were already reached (with as few actions) aren't expanded again, since their children
+    # were (or will be) searched from there; and actions seen to leave the state unchanged aren't taken again
+    prune_visited = getattr(args, "prune_visited_states", False)
+    skip_no_ops = getattr(args, "skip_no_op_actions", False)
+    use_fingerprints = (prune_visited or skip_no_ops) and hasattr(game, "stateFingerprint")
+    visited = {}                # state fingerprint -> the fewest actions it was reached with
+    no_op_actions = set()
+    search_stats = checks["search"]
+    root_fingerprint = None
+    if use_fingerprints:
+        root_fingerprint = game.stateFingerprint()
+        visited[root_fingerprint] = 0
 
-        while len(action_stack) > 0:
-            action_seq = action_stack.pop()
-            # print(action_seq)
+    # truncate possible actions if the num of possible actions is too large
+    possible_actions = sample_actions(possible_actions, args.max_num_actions, args.random_seed)
+    frontier.set_num_children(root_state, len(possible_actions))
+    for action in possible_actions:
+        action_stack.append(([action], root_state, root_fingerprint))
+
+    while len(action_stack) > 0:
+        action_seq, parent_state, parent_fingerprint = action_stack.pop()
+        # print(action_seq)
+        if skip_no_ops and action_seq[-1] in no_op_actions:
+            frontier.skip(parent_state)
+            search_stats["num_no_ops_skipped"] += 1
+            continue
+
+        search_stats["num_nodes"] += 1
+        if parent_state is not None:
+            game = frontier.restore(parent_state)
+            actions_to_take = action_seq[-1:]
+        else:
             game = TextGame(randomSeed=args.random_seed)
             game.generatePossibleActions()
-            for action in action_seq:
-                try:
-                    game.step(action)
-                    checks["step"] = True
-                except Exception as e:
-                    stacktrace = [frame.replace(os.getcwd(), "").strip() for frame in
-                                  traceback.format_tb(e.__traceback__) if gamefile in frame]
-                    checks["step"] = False
-                    checks["error_msg"] = "\n".join(stacktrace) + "\n" + str(e)
-                    return checks
-
+            actions_to_take = action_seq
+        for action in actions_to_take:
             try:
-                if not game.gameOver:
-                    if len(action_seq) < args.max_steps:
-                        try:
-                            possible_actions = game.generatePossibleActions()
-                        except Exception as e:
-                            stacktrace = [frame.replace(os.getcwd(), "").strip() for frame in
-                                          traceback.format_tb(e.__traceback__) if gamefile in frame]
-                            checks["generatePossibleActions"] = False
-                            checks["error_msg"] = "\n".join(stacktrace) + "\n" + str(e)
-                            return checks
-
-                        # truncate possible actions if the num of possible actions is too large
-                        possible_actions = sample_actions(possible_actions, args.max_num_actions // 10,
-                                                          args.random_seed)
-                        for possible_action in possible_actions:
-                            action_stack.append(action_seq + [possible_action])
-
-                elif game.gameWon:
-                    checks['winnable'] = True
-            except:
+                game.step(action)
+                checks["step"] = True
+            except MemoryError:
+                raise
+            except Exception as e:
+                stacktrace = [frame.replace(os.getcwd(), "").strip() for frame in
+                              traceback.format_tb(e.__traceback__) if gamefile in frame]
+                checks["step"] = False
+                checks["error_msg"] = "\n".join(stacktrace) + "\n" + str(e)
                 return checks
-        timedOut = False
-
-    # Check to see if the game timed out during evaluation
-    if timedOut:
-        print("Evaluation timed out after " + str(timeoutDuration) + " seconds.")
-        checks[
-            "error_msg"] = "Automatic evaluation timed out.  This could be due to an infinite loop in the code, waiting for user input outside the main() function, or some other issue or unusually-long-running procedure."
-        # Record this timeout error
-        timeoutErrors.append(gamefile)
-        return checks
 
+        fingerprint = None
+        if use_fingerprints:
+            fingerprint = game.stateFingerprint()
+            if fingerprint == parent_fingerprint:
+                no_op_actions.add(action_seq[-1])
+
+        try:
+            if not game.gameOver:
+                if len(action_seq) < args.max_steps:
+                    if prune_visited:
+                        if visited.get(fingerprint, args.max_steps + 1) <= len(action_seq):
+                            search_stats["num_pruned"] += 1
+                            continue
+                        visited[fingerprint] = len(action_seq)
+
+                    # Children are taken from the state before its actions are listed (as a replay steps them
+                    # with the actions listed at the start)
+                    state = frontier.save(game)
+                    try:
+                        possible_actions = game.generatePossibleActions()
+                    except MemoryError:
+                        raise
+                    except Exception as e:
+                        stacktrace = [frame.replace(os.getcwd(), "").strip() for frame in
+                                      traceback.format_tb(e.__traceback__) if gamefile in frame]
+                        checks["generatePossibleActions"] = False
+                        checks["error_msg"] = "\n".join(stacktrace) + "\n" + str(e)
+                        return checks
+
+                    # truncate possible actions if the num of possible actions is too large
+                    possible_actions = sample_actions(possible_actions, args.max_num_actions // 10,
+                                                      args.random_seed)
+                    frontier.set_num_children(state, len(possible_actions))
+                    for possible_action in possible_actions:
+                        action_stack.append((action_seq + [possible_action], state, fingerprint))
+
+            elif game.gameWon:
+                checks['winnable'] = True
+        except MemoryError:
+            raise
+        except:
+            return checks
     checks["runnable"] = True
     print("-> game is runnable")
+    print(f"-> searched {search_stats['num_nodes']} action sequences ({search_stats['num_pruned']} pruned as already"
+          f" visited, {search_stats['num_no_ops_skipped']} skipped as no-ops)")
+    return checks
+
+
+def check_validity(gamefile, args):
+    """ Check the validty of a game: class, methods, scoring function, runnability.
+
+        The checks run in a separate worker process, with hard limits on its wall-clock time (`args.validity_timeout`
+        seconds) and memory (`args.validity_memory_limit` MB), so that a game that gets stuck or runs away can't block
+        the evaluation: the worker is killed, and the game is reported as failing. How the worker ended is recorded
+        under "sandbox", as its "status" ("ok", "timeout", "out_of_memory", "error" or "crashed") and the limits. """
+    time_limit = getattr(args, "validity_timeout", DEFAULT_TIME_LIMIT)
+    memory_limit_mb = getattr(args, "validity_memory_limit", DEFAULT_MEMORY_LIMIT_MB)
+
+    # The other checks import the game by name, from its folder
+    if os.path.dirname(gamefile) not in sys.path:
+        sys.path.append(os.path.dirname(gamefile))
+
+    run = run_in_sandbox(run_checks, (gamefile, args), time_limit=time_limit, memory_limit_mb=memory_limit_mb)
+
+    if run["status"] == STATUS_OK:
+        checks = run["result"]
+    else:
+        checks = get_empty_checks()
+        if run["status"] == STATUS_TIMEOUT:
+            print("Evaluation timed out after " + str(time_limit) + " seconds.")
+            checks["error_msg"] = "Automatic evaluation timed out.  This could be due to an infinite loop in the code, waiting for user input outside the main() function, or some other issue or unusually-long-running procedure."
+            # Record this timeout error
+            timeoutErrors.append(gamefile)
+        elif run["status"] == STATUS_OUT_OF_MEMORY:
+            print("Evaluation ran out of memory (" + str(memory_limit_mb) + " MB).")
+            checks["error_msg"] = ("Automatic evaluation ran out of memory (over " + str(memory_limit_mb) + " MB).  This"
+                                   " could be due to a list or other structure that grows without bound, or an"
+                                   " infinite recursion.")
+        elif run["status"] == STATUS_ERROR:
+            checks["error_msg"] = run["error_msg"]
+        else:
+            print("Evaluation crashed: " + run["error_msg"])
+            checks["error_msg"] = "Automatic evaluation crashed.  " + run["error_msg"]
+
+    checks["sandbox"] = {
+        "status": run["status"],
+        "time_limit": time_limit,
+        "memory_limit_mb": memory_limit_mb,
+    }
     return checks
@@ -0,0 +1,125 @@
+import time
+
+from data.library.GameBasic import TextGame
+
+
+class VecTextGame():
+    """ Runs a batch of text games side by side (possibly different games, with different seeds), and steps them all
+        at once, e.g. to evaluate agents or to collect experience for reinforcement learning. Games that end are
+        restarted (with the same seed), so that every environment always has a game in progress. """
+
+    def __init__(self, game_classes, seeds=None, auto_reset=True, error_strategy="fail"):
+        """ `game_classes` has the TextGame class of each environment, and `seeds` the random seed it is played with
+            (by default, the index of the environment). With `auto_reset` off, an environment that ended stays ended
+            (until the next reset_all()). `error_strategy` is what to do when a game raises an exception: "fail" ends
+            the game (with the error as the observation), and "raise" raises it. """
+        self.game_classes = list(game_classes)
+        self.seeds = list(range(len(self.game_classes))) if seeds is None else list(seeds)
+        if len(self.seeds) != len(self.game_classes):
+            raise ValueError(f"Got {len(self.seeds)} seeds for {len(self.game_classes)} games")
+        if error_strategy not in ("fail", "raise"):
+            raise ValueError(f"Invalid error strategy: {error_strategy}")
+        self.auto_reset = auto_reset
+        self.error_strategy = error_strategy
+
+        self.games = [None] * len(self.game_classes)
+        self.possible_actions = [None] * len(self.game_classes)
+        self.ended = [False] * len(self.game_classes)
+        self.observations = [""] * len(self.game_classes)
+
+        # Counters for the throughput report
+        self.num_steps = 0
+        self.num_episodes = 0
+        self.num_errors = 0
+        self.elapsed = 0.0
+
+    def __len__(self):
+        return len(self.games)
+
+    def reset(self, idx):
+        """ Start a new game in one environment, and return its initial observation """
+        game_class = self.game_classes[idx]
+        # Games that use the library's reset() are copied from a cached initial state, rather than initialized again
+        if getattr(game_class, "reset", None) is TextGame.reset:
+            game = game_class.__new__(game_class)
+            game.reset(self.seeds[idx])
+        else:
+            game = game_class(randomSeed=self.seeds[idx])
+        self.games[idx] = game
+        self.possible_actions[idx] = game.generatePossibleActions()
+        self.ended[idx] = False
+        self.observations[idx] = game.observationStr
+        return game.observationStr
+
+    def reset_all(self):
+        """ Start a new game in every environment, and return their initial observations """
+        start = time.perf_counter()
+        observations = [self.reset(idx) for idx in range(len(self.games))]
+        self.elapsed += time.perf_counter() - start
+        return observations
+
+    def get_possible_actions(self):
+        """ Get the possible actions of the game in progress in each environment (as returned by its
+            generatePossibleActions(), i.e. a mapping from action strings to their arguments) """
+        return list(self.possible_actions)
+
+    def step_batch(self, actions):
+        """ Take one action in each environment. Returns the observations, scores, rewards, whether each game ended,
+            and whether it was won. The results of a game that ended are those of its last step; the environment is
+            then restarted, and get_possible_actions() lists the actions of the new game. """
+        if len(actions) != len(self.games):
+            raise ValueError(f"Got {len(actions)} actions for {len(self.games)} environments")
+        if any(game is None for game in self.games):
+            raise RuntimeError("reset_all() must be called before step_batch()")
+
+        start = time.perf_counter()
+        observations, scores, rewards, dones, wons = [], [], [], [], []
+        for idx, (game, action) in enumerate(zip(self.games, actions)):
+            # An environment that ended (without being restarted) stays as it is
+            if self.ended[idx]:
+                observations.append(self.observations[idx])
+                scores.append(game.score)
+                rewards.append(0)
+                dones.append(True)
+                wons.append(game.gameWon)
+                continue
+
+            try:
+                observation, score, reward, game_over, game_won = game.step(action)
+                if not game_over:
+                    self.possible_actions[idx] = game.generatePossibleActions()
+            except Exception as e:
+                if self.error_strategy == "raise":
+                    raise e
+                # Treat the error as the end of the game
+                self.num_errors += 1
+                observation, score, reward, game_over, game_won = f"ERROR: {e}", game.score, 0, True, False
+
+            self.num_steps += 1
+            self.observations[idx] = observation
+            observations.append(observation)
+            scores.append(score)
+            rewards.append(reward)
+            dones.append(game_over)
+            wons.append(game_won)
+
+            if game_over:
+                self.num_episodes += 1
+                self.ended[idx] = True
+                if self.auto_reset:
+                    self.reset(idx)
+
+        self.elapsed += time.perf_counter() - start
+        return observations, scores, rewards, dones, wons
+
+    def get_throughput(self):
+        """ Aggregate counts over all environments since the wrapper was made: steps taken, games that ended (and
+            those that ended with an error), seconds spent in reset_all() and step_batch(), and steps per second """
+        return {
+            "num_envs": len(self.games),
+            "steps": self.num_steps,
+            "episodes": self.num_episodes,
+            "errors": self.num_errors,
+            "seconds": self.elapsed,
+            "steps_per_sec": self.num_steps / self.elapsed if self.elapsed > 0 else 0.0,
+        }
@@ -13,9 +13,14 @@ from tqdm import tqdm
 from termcolor import colored
 
 from bytes32.utils import llm_gpt
+from bytes32.sandbox import run_in_sandbox, STATUS_OK, STATUS_TIMEOUT, STATUS_OUT_OF_MEMORY
 
 EXAMPLE_FILE = pjoin(os.path.dirname(__file__), "example.txt")
 
+# The default limits of the worker process that plays a game (each step waits on an LLM)
+DEFAULT_TIME_LIMIT = 60 * 60        # 1 hour
+DEFAULT_MEMORY_LIMIT_MB = 4096
+
 
 def clean(s):
     clean_toks = ['\n', '\t']
@@ -43,7 +48,8 @@ def llm_gpt_with_pbar(prompt, model, pbar=None, **kwargs):
 import inspect
 
 
-def check_winnability(gamefile, model_name, random_seed, env_step_limit, logger=None):
+def play_game(gamefile, model_name, random_seed, env_step_limit, logger=None):
+    """ Play a game with the LLM agent of check_winnability(), in the current process (without any limits) """
     logger = logger or logging.getLogger()
 
     # Import environment
@@ -193,6 +199,34 @@ def check_winnability(gamefile, model_name, random_seed, env_step_limit, logger=
     return stats
 
 
+def check_winnability(gamefile, model_name, random_seed, env_step_limit, logger=None, time_limit=DEFAULT_TIME_LIMIT,
+                      memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB):
+    """ Check whether an LLM agent can win a game, within `env_step_limit` actions (twice that many steps, counting its
+        thoughts).
+
+        The game is played in a separate worker process, with hard limits on its wall-clock time (`time_limit` seconds)
+        and memory (`memory_limit_mb` MB), so that a game that gets stuck or runs away can't block the evaluation. As
+        when the game raises an exception, a worker that fails (or is killed) raises a RuntimeError. How the worker
+        ended is recorded under "sandbox", as in check_validity(). """
+    run = run_in_sandbox(play_game, (gamefile, model_name, random_seed, env_step_limit, logger),
+                         time_limit=time_limit, memory_limit_mb=memory_limit_mb)
+
+    if run["status"] == STATUS_TIMEOUT:
+        raise RuntimeError(f"Winnability check timed out after {time_limit} seconds.")
+    elif run["status"] == STATUS_OUT_OF_MEMORY:
+        raise RuntimeError(f"Winnability check ran out of memory (over {memory_limit_mb} MB).")
+    elif run["status"] != STATUS_OK:
+        raise RuntimeError(run["error_msg"])
+
+    stats = run["result"]
+    stats["sandbox"] = {
+        "status": run["status"],
+        "time_limit": time_limit,
+        "memory_limit_mb": memory_limit_mb,
+    }
+    return stats
+
+
 def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument("--game_folder", default="../cleaned_generated_game",
@@ -0,0 +1,283 @@
+import os
+import sys
+import time
+import heapq
+import inspect
+import importlib
+
+from data.library.GameEngine import FrozenState, ChildState
+
+from bytes32.sandbox import run_in_sandbox, STATUS_OK
+
+# The outcomes of a search
+STATUS_WINNABLE = "winnable"        # A winning action sequence was found
+STATUS_UNWINNABLE = "unwinnable"    # Every reachable state was searched, and none is won
+STATUS_UNKNOWN = "unknown"          # The budget ran out first
+STATUS_UNSUPPORTED = "unsupported"  # The game isn't built on the library's TextGame, so its states can't be searched
+STATUS_ERROR = "error"              # The game couldn't be started, or the search was stopped
+
+STRATEGIES = ("bfs", "best-first", "iddfs")
+
+
+def expand_game(game):
+    """ Take each possible action from the current state of a game, each in a new copy of that state (so that no
+        action can leave anything behind for the next one). Returns (action, score, game_over, game_won, fingerprint,
+        child) for each action, where child.thaw() makes a game in the state after the action, and the error messages
+        of the actions that raised an exception. """
+    actions = list(game.generatePossibleActions())
+    # Children are stepped with the actions listed in this state, like a player who lists them before every step
+    parent_state = FrozenState(game)
+
+    children, errors = [], []
+    for action in actions:
+        child_game = parent_state.thaw()
+        try:
+            _, score, _, game_over, game_won = child_game.step(action)
+            fingerprint = child_game.stateFingerprint()
+        except MemoryError:
+            raise
+        except Exception as e:
+            errors.append(f"{action}: {e}")
+            continue
+        children.append((action, score, game_over, game_won, fingerprint, ChildState(parent_state, action)))
+    return children, errors
+
+
+class WinSearch():
+    """ Searches the states of a game for a win, without an LLM. States are deduplicated by their fingerprint (see
+        TextGame.stateFingerprint()), and expanded with expand_game(). The search either finds a winning action
+        sequence, or shows that no reachable state is won, or runs out of its budget (`max_nodes` states expanded, or
+        `time_limit` seconds), whichever comes first. With `max_depth`, action sequences are at most that long (and
+        exhausting them doesn't show the game is unwinnable). An action that raises an exception is a dead end (as it
+        is for an agent, whose game would stop there), and is counted in the statistics.
+
+        Strategies:
+          "bfs"         expands states by the number of actions that reach them (then by score), so the first win
+                        found is a shortest one.
+          "best-first"  expands the highest-scoring states first (then by the number of actions), which finds wins
+                        behind a trail of score increases sooner, but not necessarily the shortest ones.
+          "iddfs"       searches depth-first to increasing depths (children with higher scores first), so the first win
+                        found is a shortest one, while keeping only the states on the current path. """
+
+    def __init__(self, game, strategy="bfs", max_nodes=10000, time_limit=60, max_depth=None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Invalid search strategy: {strategy}")
+        self.game = game
+        self.strategy = strategy
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+
+        self.start = None
+        self.num_expanded = 0
+        self.num_duplicates = 0
+        self.num_errors = 0
+        self.first_error = ""
+        self.max_score = game.score
+        self.depth_reached = 0
+        self.cut_off = False        # Whether any state was left unexpanded because of `max_depth`
+
+    def is_over_budget(self):
+        return (self.num_expanded >= self.max_nodes) or (time.perf_counter() - self.start >= self.time_limit)
+
+    def expand(self, state, depth):
+        """ Expand a (frozen or child) state, reached with `depth` actions """
+        children, errors = expand_game(state.thaw())
+        self.num_expanded += 1
+        self.num_errors += len(errors)
+        if errors and not self.first_error:
+            self.first_error = errors[0]
+        for child in children:
+            self.max_score = max(self.max_score, child[1])
+        self.depth_reached = max(self.depth_reached, depth + 1)
+        return children
+
+    def run(self):
+        """ Run the search. Returns the status (one of the STATUS_* above), and the winning actions (if any). """
+        self.start = time.perf_counter()
+        if self.game.gameWon:
+            return STATUS_WINNABLE, []
+        if self.strategy == "iddfs":
+            return self.run_iddfs()
+        return self.run_priority()
+
+    def get_status_when_exhausted(self):
+        """ The status of a search that ran out of states to expand, without finding a win """
+        if self.cut_off:
+            return STATUS_UNKNOWN
+        return STATUS_UNWINNABLE
+
+    def run_priority(self):
+        """ Expand states in order of priority (see the strategies above), from a queue of states still to expand """
+        if self.strategy == "bfs":
+            get_priority = lambda depth, score: (depth, -score)
+        else:
+            get_priority = lambda depth, score: (-score, depth)
+
+        seen = {self.game.stateFingerprint()}
+        queue = [(get_priority(0, self.game.score), 0, FrozenState(self.game), [])]
+        counter = 1     # Keeps the queue first in, first out among states of the same priority
+        while queue:
+            if self.is_over_budget():
+                return STATUS_UNKNOWN, None
+            _, _, state, actions = heapq.heappop(queue)
+            if (self.max_depth is not None) and (len(actions) >= self.max_depth):
+                self.cut_off = True
+                continue
+
+            for action, score, game_over, game_won, fingerprint, child in self.expand(state, len(actions)):
+                if game_won:
+                    return STATUS_WINNABLE, actions + [action]
+                if fingerprint in seen:
+                    self.num_duplicates += 1
+                    continue
+                seen.add(fingerprint)
+                if not game_over:
+                    heapq.heappush(queue, (get_priority(len(actions) + 1, score), counter, child, actions + [action]))
+                    counter += 1
+
+        return self.get_status_when_exhausted(), None
+
+    def run_iddfs(self):
+        """ Search depth-first, with a depth limit that's raised by one until a win is found, or a search finishes
+            without any state being left unexpanded because of the limit """
+        root_state = FrozenState(self.game)
+        root_fingerprint = self.game.stateFingerprint()
+        limit = 1
+        while True:
+            self.num_errors = 0
+            self.first_error = ""
+            limited = False
+            shallowest = {root_fingerprint: 0}   # fingerprint -> the fewest actions it was reached with (this round)
+            stack = [(root_state, [])]
+            while stack:
+                if self.is_over_budget():
+                    return STATUS_UNKNOWN, None
+                state, actions = stack.pop()
+                children = self.expand(state, len(actions))
+                depth = len(actions) + 1
+
+                # Children with higher scores are searched first (so they are pushed last)
+                children.sort(key=lambda child: child[1])
+                for action, score, game_over, game_won, fingerprint, child in children:
+                    if game_won:
+                        return STATUS_WINNABLE, actions + [action]
+                    if shallowest.get(fingerprint, depth + 1) <= depth:
+                        self.num_duplicates += 1
+                        continue
+                    shallowest[fingerprint] = depth
+                    if game_over:
+                        continue
+                    if depth >= limit:
+                        limited = True
+                    else:
+                        stack.append((child, actions + [action]))
+
+            if not limited:
+                return self.get_status_when_exhausted(), None
+            if (self.max_depth is not None) and (limit >= self.max_depth):
+                self.cut_off = True
+                return self.get_status_when_exhausted(), None
+            limit += 1
+
+    def get_stats(self):
+        return {
+            "strategy": self.strategy,
+            "num_expanded": self.num_expanded,
+            "num_duplicates": self.num_duplicates,
+            "num_errors": self.num_errors,
+            "first_error": self.first_error,
+            "max_score": self.max_score,
+            "depth_reached": self.depth_reached,
+        }
+
+
+def load_game_class(gamefile):
+    """ Import the TextGame class of a game file """
+    if os.path.dirname(gamefile) not in sys.path:
+        sys.path.append(os.path.dirname(gamefile))
+    module_name = os.path.basename(gamefile)[:-3]
+    return next(obj for name, obj in inspect.getmembers(importlib.import_module(module_name), inspect.isclass)
+                if obj.__module__ == module_name and name.endswith('Game'))
+
+
+def solve_game(gamefile, random_seed, strategy="bfs", max_nodes=10000, time_limit=60, max_depth=None):
+    """ Search a game (started with `random_seed`) for a win, in the current process. Returns a dictionary with the
+        "status" of the search (one of the STATUS_* above), the winning "actions" (if any), the search statistics, and
+        an "error_msg". """
+    result = {"status": STATUS_ERROR, "actions": [], "num_valid_actions": 0, "score": 0, "error_msg": ""}
+    try:
+        game_class = load_game_class(gamefile)
+        game = game_class(randomSeed=random_seed)
+        if not hasattr(game, "stateFingerprint"):
+            result["status"] = STATUS_UNSUPPORTED
+            result["error_msg"] = "The game isn't built on the library's TextGame."
+            return result
+        result["num_valid_actions"] = len(game.generatePossibleActions())
+    except MemoryError:
+        raise
+    except Exception as e:
+        result["error_msg"] = str(e)
+        return result
+
+    search = WinSearch(game, strategy, max_nodes, time_limit, max_depth)
+    status, actions = search.run()
+    result["status"] = status
+    result["actions"] = actions or []
+    result.update(search.get_stats())
+    result["error_msg"] = search.first_error
+
+    # The score the winning actions end with (or the best one seen).  The winning actions are replayed in a new game,
+    # and only count as a win if they win it there too.
+    result["score"] = search.max_score
+    if status == STATUS_WINNABLE:
+        try:
+            game = game_class(randomSeed=random_seed)
+            for action in actions:
+                game.generatePossibleActions()
+                _, result["score"], _, _, _ = game.step(action)
+            replay_error = "" if game.gameWon else "The winning actions found by the search don't win a new game."
+        except MemoryError:
+            raise
+        except Exception as e:
+            replay_error = f"The winning actions found by the search raise an exception in a new game: {e}"
+        if replay_error:
+            result["status"] = STATUS_UNKNOWN
+            result["actions"] = []
+            result["score"] = search.max_score
+            result["error_msg"] = replay_error
+    return result
+
+
+def check_winnability_by_search(gamefile, random_seed, strategy="bfs", max_nodes=10000, time_limit=60, max_depth=None,
+                                memory_limit_mb=4096):
+    """ Check whether a game can be won by searching its states (see WinSearch), rather than by playing it with an LLM
+        agent. The search runs in a sandboxed worker process (see run_in_sandbox()), which is given a minute past
+        `time_limit` before it's killed.
+
+        Returns the results in the same form as check_winnability(), with the search's own results under "solver". A
+        "winnable" or "unwinnable" status settles whether the game can be won (under the search's budget), and an
+        "unknown" one doesn't. """
+    run = run_in_sandbox(solve_game, (gamefile, random_seed, strategy, max_nodes, time_limit, max_depth),
+                         time_limit=time_limit + 60, memory_limit_mb=memory_limit_mb)
+    if run["status"] == STATUS_OK:
+        solver = run["result"]
+    else:
+        solver = {"status": STATUS_ERROR, "actions": [], "num_valid_actions": 0, "score": 0,
+                  "error_msg": run["error_msg"]}
+
+    won = (solver["status"] == STATUS_WINNABLE)
+    return {
+        "gpt_done": False,
+        "gpt_bug": False,
+        "num_actions": solver["num_valid_actions"],
+        "score": solver["score"],
+        "game_won": won,
+        "done": won,
+        "step": len(solver["actions"]),
+        "max_steps": 0,
+        "history": solver["actions"],
+        "transcript": "",
+        "init_prompt": "",
+        "solver": solver,
+    }
@@ -1,9 +1,11 @@
 import random
 
+from data.library.GameEngine import EngineObject, EngineWorld, EngineGame
+
 #
 # Abstract class for all game objects
 #
-class GameObject():
+class GameObject(EngineObject):
     def __init__(self, name):
         # Prevent this constructor from running if it's already been run during multiple inheritance
         if hasattr(self, "constructorsRun"):
@@ -278,12 +280,17 @@ class Substance(GameObject):
             self.properties["stateOfMatter"] = "gas"
             self.name = self.properties["gasName"]
 
+        # The state of matter only depends on the substance's own properties, so it can't change until one of them does
+        # (subclasses may do more in their tick(), so they're left awake)
+        if type(self).tick is Substance.tick:
+            self.sleep()
+
     def makeDescriptionStr(self, makeDetailed=False):
         return "some " + self.name
 
 
 # The world is the root object of the game object tree.  In single room environments, it's where all the objects are located.
-class World(Container):
+class World(EngineWorld, Container):
     def __init__(self, room):
         Container.__init__(self, room)
         self.room = room
@@ -310,7 +317,7 @@ class Agent(Container):
         return "yourself"
 
 
-class TextGame:
+class TextGame(EngineGame):
 
     def __init__(self, randomSeed):
         # Random number generator, initialized with a seed passed as an argument
@@ -346,6 +353,11 @@ class TextGame:
     # Make a dictionary whose keys are object names (strings), and whose values are lists of object references with those names.
     # This is useful for generating valid actions, and parsing user input.
     def makeNameToObjectDict(self):
+        # Reuse the last dictionary if nothing in the world has changed since (it must not be modified)
+        nameToObjectDict = self.getCachedNameToObjectDict()
+        if nameToObjectDict is not None:
+            return nameToObjectDict
+
         # Get a list of all game objects
         allObjects = self.rootObject.getAllContainedObjectsRecursive()
 
@@ -359,6 +371,7 @@ class TextGame:
                 else:
                     nameToObjectDict[name] = [obj]
 
+        self.cacheNameToObjectDict(nameToObjectDict)
         return nameToObjectDict
 
     #
@@ -386,6 +399,11 @@ class TextGame:
         if (obj.parentContainer == None):
             return "Something has gone wrong -- that object is dangling in the void.  You can't take that."
 
+        # The container it's in must be reachable (e.g. not a box in a closed fridge).  The container itself being
+        # closed is reported when taking from it.
+        if not self.isAccessible(obj.parentContainer):
+            return "You can't reach the " + obj.getReferents()[0] + "."
+
         # Take the object from the parent container, and put it in the inventory
         obsStr, objRef, success = obj.parentContainer.takeObjectFromContainer(obj)
         if (success == False):
@@ -405,6 +423,10 @@ class TextGame:
         if (objToMove.parentContainer != self.agent):
             return "You don't currently have the " + objToMove.getReferents()[0] + " in your inventory."
 
+        # The destination must be reachable (e.g. not a box in a closed fridge)
+        if not self.isAccessible(newContainer):
+            return "You can't reach the " + newContainer.getReferents()[0] + "."
+
         # Take the object from it's current container, and put it in the new container.
         # Deep copy the reference to the original parent container, because the object's parent container will be changed when it's taken from the original container
         originalContainer = objToMove.parentContainer
@@ -445,8 +467,8 @@ class TextGame:
 
     # Call the object update for each object in the environment
     def doWorldTick(self):
-        # Get a list of all objects in the environment
-        allObjects = self.rootObject.getAllContainedObjectsRecursive()
+        # Get the objects in the environment that do something when ticked (and aren't asleep)
+        allObjects = self.iterObjectsToTick()
         # Loop through all objects, and call their tick()
         for obj in allObjects:
             obj.tick()
@@ -0,0 +1,2453 @@
+#
+# Engine internals used by GameBasic.py.
+# These are kept out of GameBasic.py so that the template shown to code-generation models stays short.
+#
+
+import array
+import copy
+import dis
+import hashlib
+import inspect
+import io
+import itertools
+import operator
+import pickle
+import random
+import struct
+import sys
+import types
+from collections import deque
+from collections.abc import KeysView, Mapping, MutableMapping
+
+#
+# Observed collections
+#
+
+# The properties that most objects have (set by GameObject, Container and Device), and the type of their values.
+# These are kept in slots of a PropertyStore, rather than in a dictionary of their own for every object.
+COMMON_PROPERTIES = (
+    "isContainer",                  # bool
+    "isMoveable",                   # bool
+    "isUsable",                     # bool
+    "isActivatable",                # bool
+    "temperature",                  # float (degrees C)
+    "isCombustible",                # bool
+    "isCombusting",                 # bool
+    "combustionTimeRemaining",      # int
+    "isOpenable",                   # bool
+    "isOpen",                       # bool
+    "containerPrefix",              # str ("in", "on", ...)
+    "isDevice",                     # bool
+    "isOn",                         # bool
+)
+COMMON_PROPERTY_NAMES = frozenset(COMMON_PROPERTIES)
+
+
+# The properties of an object.  It can be used like a dictionary, but stores the common properties in slots (with
+# a dictionary for any other, game-specific, properties), and tells its owning object whenever a property is written.
+# (An object's properties are always a PropertyStore: assigning a dictionary to them makes one from it.)
+# Iterating over it lists the common properties first, followed by the others in the order they were added.
+class PropertyStore(MutableMapping):
+    __slots__ = ("owner", "extra") + COMMON_PROPERTIES
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.extra = None               # Game-specific properties (a dictionary, created when first needed)
+
+    def __getitem__(self, key):
+        try:
+            if key in COMMON_PROPERTY_NAMES:
+                return getattr(self, key)
+            value = self.extra[key]
+        except (AttributeError, TypeError):
+            # An unset slot, or no game-specific properties
+            raise KeyError(key) from None
+        # (A value that can be changed in place, such as a list, is saved before a journaled step gets to change it)
+        if (StepJournal.active is not None) and (type(value) not in ATOMIC_TYPES):
+            journal = StepJournal.recording(self.owner)
+            if journal is not None:
+                journal.recordValue(value)
+        return value
+
+    def __setitem__(self, key, value):
+        if StepJournal.active is not None:
+            journal = StepJournal.recording(self.owner)
+            if journal is not None:
+                journal.recordProperty(self, key)
+        if key in COMMON_PROPERTY_NAMES:
+            setattr(self, key, value)
+        elif self.extra is None:
+            self.extra = {key: value}
+        else:
+            self.extra[key] = value
+        # Objects that aren't in a world yet (e.g. while they are being constructed) have nothing to update
+        owner = self.owner
+        if (owner is not None) and (owner.worldRoot is not None):
+            owner.onPropertyChanged(key)
+
+    def __delitem__(self, key):
+        if StepJournal.active is not None:
+            journal = StepJournal.recording(self.owner)
+            if journal is not None:
+                journal.recordProperty(self, key)
+        try:
+            if key in COMMON_PROPERTY_NAMES:
+                delattr(self, key)
+            else:
+                del self.extra[key]
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+        owner = self.owner
+        if (owner is not None) and (owner.worldRoot is not None):
+            owner.onPropertyChanged(key)
+
+    def __contains__(self, key):
+        if key in COMMON_PROPERTY_NAMES:
+            return hasattr(self, key)
+        extra = self.extra
+        return (extra is not None) and (key in extra)
+
+    def get(self, key, default=None):
+        if key in COMMON_PROPERTY_NAMES:
+            return getattr(self, key, default)
+        extra = self.extra
+        if extra is None:
+            return default
+        value = extra.get(key, default)
+        if (StepJournal.active is not None) and (type(value) not in ATOMIC_TYPES):
+            journal = StepJournal.recording(self.owner)
+            if journal is not None:
+                journal.recordValue(value)
+        return value
+
+    def __iter__(self):
+        for key in COMMON_PROPERTIES:
+            if hasattr(self, key):
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for key in COMMON_PROPERTIES if hasattr(self, key)) + len(self.extra or ())
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+# Lists at least this long keep an index of the objects in them, so that checking whether an object is in the list
+# doesn't take longer as the list grows (shorter lists are quicker to search directly)
+MEMBERSHIP_INDEX_MIN_LENGTH = 32
+
+# The list of objects held by a container.  It behaves exactly like a list, but reports objects entering or
+# leaving it to its owner, so that indices kept on the world root stay in sync even when a game edits
+# `contains` directly instead of going through addObject()/removeObject().  (An object's contents are always an
+# ObjectList: assigning a list to them makes one from it.)
+class ObjectList(list):
+    __slots__ = ("owner", "members")
+
+    def __init__(self, owner, objs=()):
+        list.__init__(self, objs)
+        self.owner = owner
+        # id(object) -> the number of times it's in the list, kept once the list is long (objects are compared by
+        # identity, as game objects don't define equality)
+        self.members = None
+
+    # Copies and pickles are rebuilt through the constructor, rather than by appending to an empty list, since the
+    # owner is still only half restored at that point
+    def __reduce_ex__(self, protocol):
+        return (ObjectList, (self.owner, list(self)))
+
+    def notify(self, added=(), removed=()):
+        owner = getattr(self, "owner", None)
+        if owner is not None:
+            owner.onContentsChanged(added, removed)
+
+    # Called before the list is changed, so that a journaled step can put it back
+    def journal(self):
+        if StepJournal.active is not None:
+            journal = StepJournal.recording(getattr(self, "owner", None))
+            if journal is not None:
+                journal.recordContents(self)
+
+    def __contains__(self, obj):
+        members = self.members
+        if members is None:
+            if len(self) < MEMBERSHIP_INDEX_MIN_LENGTH:
+                return list.__contains__(self, obj)
+            members = self.members = {}
+            for member in self:
+                self.addMember(member)
+        return id(obj) in members
+
+    def addMember(self, obj):
+        self.members[id(obj)] = self.members.get(id(obj), 0) + 1
+
+    def removeMember(self, obj):
+        count = self.members.pop(id(obj))
+        if count > 1:
+            self.members[id(obj)] = count - 1
+
+    def append(self, obj):
+        self.journal()
+        list.append(self, obj)
+        if self.members is not None:
+            self.addMember(obj)
+        self.notify(added=(obj,))
+
+    def extend(self, objs):
+        objs = list(objs)
+        self.journal()
+        list.extend(self, objs)
+        if self.members is not None:
+            for obj in objs:
+                self.addMember(obj)
+        self.notify(added=objs)
+
+    def __iadd__(self, objs):
+        self.extend(objs)
+        return self
+
+    def insert(self, index, obj):
+        self.journal()
+        list.insert(self, index, obj)
+        if self.members is not None:
+            self.addMember(obj)
+        self.notify(added=(obj,))
+
+    def remove(self, obj):
+        # (An object that isn't in a long list is turned away without searching it)
+        if (self.members is not None) and (id(obj) not in self.members):
+            raise ValueError("list.remove(x): x not in list")
+        self.journal()
+        list.remove(self, obj)
+        if self.members is not None:
+            self.removeMember(obj)
+        self.notify(removed=(obj,))
+
+    def pop(self, index=-1):
+        self.journal()
+        obj = list.pop(self, index)
+        if self.members is not None:
+            self.removeMember(obj)
+        self.notify(removed=(obj,))
+        return obj
+
+    # The changes below can replace any of the objects, so the index (if any) is made again when it's next needed
+    def clear(self):
+        removed = list(self)
+        self.journal()
+        list.clear(self)
+        self.members = None
+        self.notify(removed=removed)
+
+    def __setitem__(self, index, value):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        self.journal()
+        list.__setitem__(self, index, value)
+        self.members = None
+        added = self[index] if isinstance(index, slice) else [value]
+        self.notify(added=added, removed=removed)
+
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        self.journal()
+        list.__delitem__(self, index)
+        self.members = None
+        self.notify(removed=removed)
+
+    def sort(self, *args, **kwargs):
+        self.journal()
+        list.sort(self, *args, **kwargs)
+        self.notify()
+
+    def reverse(self):
+        self.journal()
+        list.reverse(self)
+        self.notify()
+
+
+#
+# Referent index
+#
+
+contextFreeReferentsByClass = {}
+
+# Check whether getReferents() can be called without arguments on instances of a class
+def hasContextFreeReferents(cls):
+    if cls not in contextFreeReferentsByClass:
+        try:
+            parameters = inspect.signature(cls.getReferents).parameters.values()
+            contextFreeReferentsByClass[cls] = sum(1 for p in parameters if p.default is p.empty and p.kind == p.POSITIONAL_OR_KEYWORD) <= 1
+        except (TypeError, ValueError):
+            contextFreeReferentsByClass[cls] = True
+    return contextFreeReferentsByClass[cls]
+
+
+# An index from referents (names an object can be called by) to the objects in a world.
+# It is owned by the World root and kept up to date by EngineObject as objects enter or leave the world, are
+# renamed, or change properties that their getReferents() depends on.  Referents are recomputed lazily (on the
+# next lookup), since during addObject() the parent link is only set after the object enters `contains`.
+class ReferentIndex():
+    def __init__(self, world):
+        self.world = world
+        self.objectsByReferent = {}     # referent -> list of objects (the referents each object is currently indexed
+                                        # under are kept in its `indexedReferents`)
+        self.dirty = {}                 # objects whose referents need to be recomputed (insertion-ordered set)
+        # Objects whose class has its own getReferents(), which may depend on any of their attributes (e.g. an apple
+        # named by how ripe it is), or those of other objects (insertion-ordered set)
+        self.customObjects = {}
+        # Bumped whenever the set of objects in the world, their order, or their referents change
+        self.generation = 0
+        # Bumped whenever the set of objects in the world or their order change
+        self.treeGeneration = 0
+        # Objects that changed in a way that can change the actions involving them
+        self.changes = ChangeRecorder()
+        # Every recorder of changes to this world (the one above, and any others subscribed to it)
+        self.recorders = [self.changes]
+
+        for obj in world.contains:
+            self.attach(obj)
+
+    # Add an object (and everything it contains) to the index
+    def attach(self, obj):
+        # Contents are found through getAllContainedObjectsRecursive(), since some games override it (e.g. the two
+        # sides of a balance scale are contained in the scale without being in its `contains` list)
+        for cur in [obj] + obj.getAllContainedObjectsRecursive():
+            if cur.worldRoot is self.world:
+                continue
+            cur.worldRoot = self.world
+            cur.indexedReferents = ()
+            # A sleeping object isn't woken by changes made while it was out of the world, so wake it on entry
+            cur._engineAsleep = False
+            self.dirty[cur] = None
+            if hasCustomReferents(type(cur)) and hasContextFreeReferents(type(cur)):
+                self.customObjects[cur] = None
+            self.recordChange(cur)
+        self.generation += 1
+        self.treeGeneration += 1
+
+    # Remove an object (and everything it contains) from the index
+    def detach(self, obj):
+        for cur in [obj] + obj.getAllContainedObjectsRecursive():
+            if cur.worldRoot is not self.world:
+                continue
+            cur.worldRoot = None
+            self.dirty.pop(cur, None)
+            self.customObjects.pop(cur, None)
+            self.recordChange(cur)
+            for referent in cur.indexedReferents:
+                self.removeReferent(referent, cur)
+            cur.indexedReferents = ()
+        self.generation += 1
+        self.treeGeneration += 1
+
+    # Start recording changes to this world with another recorder
+    def subscribe(self, recorder):
+        self.recorders.append(recorder)
+
+    def unsubscribe(self, recorder):
+        if recorder in self.recorders:
+            self.recorders.remove(recorder)
+
+    # Record a change to an object with every recorder
+    def recordChange(self, obj):
+        for recorder in self.recorders:
+            recorder.recordChange(obj)
+
+    # Record that a property of an object was written ("name" when it is renamed, and "contains" when its contents
+    # change) with every recorder that watches it
+    def recordPropertyChange(self, obj, propertyName):
+        for recorder in self.recorders:
+            recorder.recordPropertyChange(obj, propertyName)
+
+    # Note that the referents of an object may have changed
+    def markDirty(self, obj):
+        self.dirty[obj] = None
+
+    # Note that an attribute of an object in the world was written.  Attributes aren't observed one by one like
+    # properties are, so the referents of every object with custom referents are recomputed (on the next lookup).
+    def markAttributeChanged(self):
+        if self.customObjects:
+            self.dirty.update(self.customObjects)
+
+    # Note that the order of objects in the world has changed
+    def markReordered(self):
+        self.generation += 1
+        self.treeGeneration += 1
+
+    def removeReferent(self, referent, obj):
+        objs = self.objectsByReferent[referent]
+        objs.remove(obj)
+        if not objs:
+            del self.objectsByReferent[referent]
+
+    # Recompute the referents of any objects that were marked dirty
+    def flush(self):
+        while self.dirty:
+            obj = next(iter(self.dirty))
+            del self.dirty[obj]
+            if obj.worldRoot is not self.world:
+                continue
+            oldReferents = obj.indexedReferents
+            # Objects whose referents depend on context (e.g. a door named after the room it leads to) aren't indexed
+            if not hasContextFreeReferents(type(obj)):
+                continue
+            newReferents = tuple(obj.getReferents())
+            if newReferents == oldReferents:
+                continue
+            for referent in oldReferents:
+                self.removeReferent(referent, obj)
+            for referent in newReferents:
+                if referent in self.objectsByReferent:
+                    self.objectsByReferent[referent].append(obj)
+                else:
+                    self.objectsByReferent[referent] = [obj]
+            obj.indexedReferents = newReferents
+            self.generation += 1
+            # A renamed object changes its own actions, and those of the objects inside it (e.g. "take water from pot")
+            self.recordChange(obj)
+            for containedObj in obj.iterContainedObjectsRecursive():
+                self.recordChange(containedObj)
+
+    # Get the objects that can be referred to by a given name.  The returned list is owned by the index, and must not be modified.
+    def lookup(self, referent):
+        if self.dirty:
+            self.flush()
+        return self.objectsByReferent.get(referent, ())
+
+    # Get a counter that changes whenever the result of TextGame.makeNameToObjectDict() could change
+    def getGeneration(self):
+        if self.dirty:
+            self.flush()
+        return self.generation
+
+
+#
+# Object tree
+#
+
+customTraversalByClass = {}
+EMPTY_RANGE = (0, 0)
+
+# A flattened (depth-first) listing of the objects in a world, that getAllContainedObjectsRecursive() answers from for
+# any object in the world.  It is owned by the World root, and rebuilt only when an object enters, leaves, or moves
+# within the world.
+class ObjectTree():
+    def __init__(self, world, baseTraversal):
+        self.world = world
+        self.referentIndex = world.getReferentIndex()
+        self.baseTraversal = baseTraversal
+        self.objects = []               # every object in the world, in the order getAllContainedObjectsRecursive() lists them
+        self.ranges = {}                # object -> (start, end) of the objects it contains, within `objects`
+        self.generation = None          # the referent index's tree generation that `objects` was built at
+
+    # Check whether objects of a class list their contents in their own way (e.g. the sides of a balance scale)
+    def hasCustomTraversal(self, cls):
+        if cls not in customTraversalByClass:
+            customTraversalByClass[cls] = cls.getAllContainedObjectsRecursive is not self.baseTraversal
+        return customTraversalByClass[cls]
+
+    # Get a list of the objects contained (recursively) in an object.  Returns None for objects whose contents are only
+    # known to a custom traversal.
+    def getContainedObjects(self, obj):
+        if self.referentIndex.treeGeneration != self.generation:
+            self.rebuild()
+        containedRange = self.ranges.get(obj)
+        if containedRange is None:
+            return None
+        return self.objects[containedRange[0]:containedRange[1]]
+
+    # Like getContainedObjects(), but returns an iterator rather than a list
+    def iterContainedObjects(self, obj):
+        if self.referentIndex.treeGeneration != self.generation:
+            self.rebuild()
+        containedRange = self.ranges.get(obj)
+        if containedRange is None:
+            return None
+        return itertools.islice(self.objects, containedRange[0], containedRange[1])
+
+    # Flatten the tree iteratively.  A new list is made each time, so that callers iterating over the old one (while
+    # objects move around) aren't disturbed.
+    def rebuild(self):
+        # Custom traversals called from here list their contents the slow way, rather than from the half-built tree
+        self.ranges = {}
+        self.generation = self.referentIndex.treeGeneration
+        objects = []
+        ranges = {}
+        world = self.world
+        iterators = [iter(world.contains)]
+        openObjects = []                # objects whose contents are being listed, and where their contents start
+        append = objects.append
+        while iterators:
+            obj = next(iterators[-1], None)
+            if obj is None:
+                iterators.pop()
+                if openObjects:
+                    openObj, start = openObjects.pop()
+                    ranges[openObj] = (start, len(objects))
+                continue
+            append(obj)
+            cls = type(obj)
+            if customTraversalByClass.get(cls, True) and self.hasCustomTraversal(cls):
+                objects.extend(obj.getAllContainedObjectsRecursive())
+            elif obj.contains:
+                openObjects.append((obj, len(objects)))
+                iterators.append(iter(obj.contains))
+            else:
+                # (Most objects contain nothing)
+                ranges[obj] = EMPTY_RANGE
+        ranges[world] = (0, len(objects))
+        self.objects = objects
+        self.ranges = ranges
+
+
+#
+# Tick scheduler
+#
+
+ticksByClass = {}
+
+# Keeps the list of objects in a world that do something when ticked (those whose class overrides the base tick()),
+# in the order that TextGame.doWorldTick() has always ticked them in.  It is owned by the World root, and rebuilt only
+# when an object enters, leaves, or moves within the world.
+class TickScheduler():
+    def __init__(self, world, baseTick):
+        self.world = world
+        self.baseTick = baseTick
+        self.tickingObjects = []
+        self.tickingObjectsKey = None
+
+    # Check whether objects of a class do anything when ticked
+    def overridesTick(self, cls):
+        if cls not in ticksByClass:
+            ticksByClass[cls] = cls.tick is not self.baseTick
+        return ticksByClass[cls]
+
+    # Get the objects to tick, in order (including ones that are asleep).  The returned list is owned by the scheduler,
+    # and must not be modified.
+    def getTickingObjects(self):
+        cacheKey = self.world.getReferentIndex().treeGeneration
+        if cacheKey != self.tickingObjectsKey:
+            self.tickingObjects = [obj for obj in self.world.getAllContainedObjectsRecursive() if self.overridesTick(type(obj))]
+            self.tickingObjectsKey = cacheKey
+        return self.tickingObjects
+
+
+#
+# Access index
+#
+
+# Answers which containers an object in a world is (recursively) in, and whether it can be reached (no container around
+# it is closed).  It is owned by the World root, and its answers are kept until an object enters, leaves, or moves
+# within the world, or a container is opened or closed.
+class AccessIndex():
+    def __init__(self, world):
+        self.world = world
+        self.changes = ChangeRecorder(frozenset(["isOpen"]))
+        world.getReferentIndex().subscribe(self.changes)
+        self.paths = {}                 # object -> the containers it's in, innermost first
+        self.accessible = {}            # object -> whether it can be reached
+        self.cacheKey = None            # the tree generation and changes version that the answers hold for
+
+    # Forget the answers if the world has changed since they were worked out
+    def check(self):
+        cacheKey = (self.world.getReferentIndex().treeGeneration, self.changes.version)
+        if cacheKey != self.cacheKey:
+            self.paths.clear()
+            self.accessible.clear()
+            self.changes.popChangedObjects()
+            self.cacheKey = cacheKey
+
+    # Get the containers an object is in, innermost first.  The returned tuple is shared, and ends with the world.
+    def pathToRoot(self, obj):
+        self.check()
+        return self.findPath(obj)
+
+    def findPath(self, obj):
+        path = self.paths.get(obj)
+        if path is None:
+            parent = obj.parentContainer
+            path = () if parent is None else (parent,) + self.findPath(parent)
+            self.paths[obj] = path
+        return path
+
+    # Check whether an object can be reached: it's in the world, and none of the containers it's in is closed
+    def isAccessible(self, obj):
+        self.check()
+        return self.findAccessible(obj)
+
+    def findAccessible(self, obj):
+        accessible = self.accessible.get(obj)
+        if accessible is None:
+            parent = obj.parentContainer
+            if parent is None:
+                accessible = obj is self.world
+            else:
+                accessible = (parent.getProperty("isOpen") != False) and self.findAccessible(parent)
+            self.accessible[obj] = accessible
+        return accessible
+
+
+#
+# Change recording
+#
+
+# Records which objects of a world changed in a way that can change the actions involving them: they entered, left,
+# or moved within the world, their referents changed, or one of the watched properties (such as "containerPrefix")
+# was written.  Changes accumulate over a step, until they are collected with popChangedObjects().
+class ChangeRecorder():
+    def __init__(self, watchedProperties=frozenset(["containerPrefix", "isContainer"])):
+        self.changedObjects = {}        # insertion-ordered set
+        # Properties that action strings depend on (None means every property is watched)
+        self.watchedProperties = watchedProperties
+        # Bumped whenever a change is recorded
+        self.version = 0
+
+    def recordChange(self, obj):
+        self.changedObjects[obj] = None
+        self.version += 1
+
+    # Called whenever a property of an object in the world is written
+    def recordPropertyChange(self, obj, propertyName):
+        if (self.watchedProperties is None) or (propertyName in self.watchedProperties):
+            self.recordChange(obj)
+
+    # Also watch the given property names (None watches every property)
+    def watchProperties(self, propertyNames):
+        if propertyNames is None:
+            self.watchedProperties = None
+        elif self.watchedProperties is not None:
+            self.watchedProperties = self.watchedProperties.union(propertyNames)
+
+    # Get the objects that changed since the last call, and start recording afresh
+    def popChangedObjects(self):
+        changedObjects = self.changedObjects
+        self.changedObjects = {}
+        return changedObjects
+
+
+#
+# Action space
+#
+
+# Values that an action template can derive from an object argument (e.g. "take {0} from {0.container}")
+def containerReferent(obj):
+    return obj.parentContainer.getReferents()[0]
+
+def containerPrefix(obj):
+    return obj.properties.get("containerPrefix", "in") if obj.properties.get("isContainer") else "in"
+
+DERIVED_SLOTS = {
+    "container": containerReferent,     # The first referent of the object's container
+    "prefix": containerPrefix,          # "in", "on", ... when putting something in/on this object
+}
+
+
+# A single action pattern, like "put {0} {1.prefix} {1}".  {N} is the referent of the N-th object argument, and
+# {N.name} is a value derived from it (see DERIVED_SLOTS).
+class ActionTemplate():
+    def __init__(self, pattern, verb, condition=None):
+        self.pattern = pattern
+        self.verb = verb
+        self.condition = condition      # Optional filter on the object arguments (e.g. only containers can be opened)
+
+        # Split the pattern into literal strings and (argument index, derived slot name or None) slots
+        self.tokens = []
+        pos = 0
+        while pos < len(pattern):
+            start = pattern.find("{", pos)
+            if start == -1:
+                self.tokens.append(pattern[pos:])
+                break
+            end = pattern.index("}", start)
+            if start > pos:
+                self.tokens.append(pattern[pos:start])
+            argIdx, _, slotName = pattern[start+1:end].partition(".")
+            self.tokens.append((int(argIdx), slotName or None))
+            pos = end + 1
+
+        self.arity = len(set(token[0] for token in self.tokens if isinstance(token, tuple)))
+        self.prefix = self.tokens[0] if (self.tokens and isinstance(self.tokens[0], str)) else ""
+
+        # Precompile rendering into a format string, whose fields are the referents followed by any derived values
+        self.derivedSlots = []
+        formatParts = []
+        for token in self.tokens:
+            if isinstance(token, str):
+                formatParts.append(token.replace("{", "{{").replace("}", "}}"))
+            elif token[1] is None:
+                formatParts.append("{" + str(token[0]) + "}")
+            else:
+                formatParts.append("{" + str(self.arity + len(self.derivedSlots)) + "}")
+                self.derivedSlots.append((token[0], DERIVED_SLOTS[token[1]]))
+        self.format = "".join(formatParts)
+
+    # Render the action string for a given tuple of object arguments, with the referents they are called by
+    def render(self, objs, referents):
+        if self.derivedSlots:
+            return self.format.format(*referents, *[getValue(objs[argIdx]) for argIdx, getValue in self.derivedSlots])
+        return self.format.format(*referents)
+
+    # Split an action string into the text of each slot.  Yields one list per way of matching the pattern.
+    def split(self, actionStr, tokenIdx=0, pos=0, slotTexts=()):
+        if tokenIdx == len(self.tokens):
+            if pos == len(actionStr):
+                yield list(slotTexts)
+            return
+        token = self.tokens[tokenIdx]
+        if isinstance(token, str):
+            if actionStr.startswith(token, pos):
+                yield from self.split(actionStr, tokenIdx+1, pos+len(token), slotTexts)
+            return
+        # A slot runs up to the next literal (or the end of the string)
+        if tokenIdx+1 == len(self.tokens):
+            if pos < len(actionStr):
+                yield from self.split(actionStr, tokenIdx+1, len(actionStr), slotTexts + (actionStr[pos:],))
+            return
+        nextLiteral = self.tokens[tokenIdx+1]
+        end = actionStr.find(nextLiteral, pos+1)
+        while end != -1:
+            yield from self.split(actionStr, tokenIdx+1, end, slotTexts + (actionStr[pos:end],))
+            end = actionStr.find(nextLiteral, end+1)
+
+    # Resolve an action string into a list of argument lists (e.g. [["put", pot, stove]]), in enumeration order
+    def resolve(self, actionStr, nameToObjectDict):
+        out = []
+        if not actionStr.startswith(self.prefix):
+            return out
+        slots = [token for token in self.tokens if isinstance(token, tuple)]
+        for slotTexts in self.split(actionStr):
+            # Work out the referent used for each object argument
+            referents = [None] * self.arity
+            consistent = True
+            for (argIdx, slotName), text in zip(slots, slotTexts):
+                if slotName is None:
+                    if referents[argIdx] not in (None, text):
+                        consistent = False
+                    referents[argIdx] = text
+            if not consistent or any(referent not in nameToObjectDict for referent in referents):
+                continue
+            # Find the objects with those referents that also match any derived slots
+            for objs in itertools.product(*[nameToObjectDict[referent] for referent in referents]):
+                if len(set(map(id, objs))) < len(objs):
+                    continue
+                if any(slotName is not None and DERIVED_SLOTS[slotName](objs[argIdx]) != text for (argIdx, slotName), text in zip(slots, slotTexts)):
+                    continue
+                if (self.condition is not None) and not self.condition(*objs):
+                    continue
+                out.append([self.verb] + list(objs))
+        return out
+
+
+templateCache = {}
+
+
+# Shows the keys of an ActionSpace the same way as the keys of a dictionary (e.g. for the "help" command)
+class ActionKeysView(KeysView):
+    def __repr__(self):
+        return "dict_keys(" + repr(list(self)) + ")"
+
+
+# The possible actions of a game, described by action templates instead of an enumerated dictionary.
+# It can be used wherever the dictionary returned by generatePossibleActions() is expected: looking up an action
+# string parses it and resolves its arguments against the current world, while listing every possible action
+# (which is quadratic in the number of objects) only happens when the keys are iterated.
+#
+# Listing is incremental: the actions rendered for each tuple of object arguments are kept between steps, and only
+# the entries involving objects that the world's ChangeRecorder reports as changed are rendered again.
+#
+# Actions can also be listed without rendering any strings, as codes of integers (see getEncodedActions()).  A code
+# can be looked up (e.g. by step()) in place of its action string, and rendered when a string is needed for display.
+class ActionSpace(Mapping):
+    # Set to False to list every action from scratch each time (e.g. to measure the benefit of incremental listing)
+    incremental = True
+
+    def __init__(self, game):
+        self.game = game
+        self.templates = []
+        # Properties that template conditions depend on (None if a condition may depend on any property)
+        self.conditionProperties = frozenset()
+        # The rendered actions for each tuple of object arguments, as (referents, objects) -> [(action string,
+        # argument list), ...], along with the keys involving each object.  These are kept in sync with `changes`.
+        self.changes = None
+        self.entries = {}
+        self.entryKeysByObject = {}
+        # The last complete listing (action string -> list of argument lists), and the key of the state it was made for
+        self.table = None
+        self.tableKey = None
+        # Encoded actions: the number of integers in each code, the ids given to objects (which are kept for the life of
+        # the game), and the last encoded listing and the key of the state it was made for
+        self.encodedWidth = 1
+        self.objectIds = {}
+        self.objectsById = []
+        self.encodedTable = None
+        self.encodedTableKey = None
+        # The objects that can be referred to, for the name-to-object dictionary they were collected from
+        self.listedObjects = None
+        self.listedObjectsSource = None
+
+    def getNameToObjectDict(self):
+        return self.game.makeNameToObjectDict()
+
+    # Register an action template, e.g. addAction("take {0} from {0.container}", "take").
+    # A condition is a filter on the object arguments; `dependsOn` lists the properties it reads (if it isn't given,
+    # any property change counts as a change to the actions of the object).
+    def addAction(self, pattern, verb, condition=None, dependsOn=None):
+        # Templates don't change once parsed, so games share them (each new game registers the same ones again)
+        key = (pattern, verb, condition)
+        if key not in templateCache:
+            templateCache[key] = ActionTemplate(pattern, verb, condition)
+        self.templates.append(templateCache[key])
+        self.encodedWidth = max(self.encodedWidth, 1 + templateCache[key].arity)
+        if condition is not None:
+            if dependsOn is None:
+                self.conditionProperties = None
+            elif self.conditionProperties is not None:
+                self.conditionProperties = self.conditionProperties.union(dependsOn)
+        # Start over on the next listing
+        self.changes = None
+        self.tableKey = None
+        self.encodedTableKey = None
+
+    # Drop the rendered actions of any objects that changed since the last call.  Returns a key for the current
+    # state of the world's actions, or None if the world doesn't record its changes.
+    def syncChanges(self):
+        getReferentIndex = getattr(self.game.rootObject, "getReferentIndex", None)
+        if (getReferentIndex is None) or not self.incremental:
+            return None
+        referentIndex = getReferentIndex()
+        # Getting the generation recomputes any stale referents, which records the objects whose referents changed
+        generation = referentIndex.getGeneration()
+        changes = referentIndex.changes
+        if changes is not self.changes:
+            # A different world (e.g. after the game was reset)
+            self.changes = changes
+            self.entries = {}
+            self.entryKeysByObject = {}
+            changes.watchProperties(self.conditionProperties)
+            changes.popChangedObjects()
+        else:
+            entries = self.entries
+            for obj in changes.popChangedObjects():
+                for key in self.entryKeysByObject.pop(obj, ()):
+                    entries.pop(key, None)
+        return (changes, generation, changes.version)
+
+    # Get the possible actions as a dictionary (action string -> list of argument lists), in the same order as the
+    # classic nested loops.  The dictionary is reused until the world changes, and must not be modified.
+    def getActionTable(self):
+        tableKey = self.syncChanges()
+        if (tableKey is not None) and (tableKey == self.tableKey):
+            return self.table
+        table = {}
+        for actionStr, args in self.iterActions():
+            if actionStr in table:
+                table[actionStr].append(args)
+            else:
+                table[actionStr] = [args]
+        if tableKey is not None:
+            self.table = table
+            self.tableKey = tableKey
+        return table
+
+    # Get the argument lists for an action string (an empty list if the action isn't possible).  An encoded action
+    # resolves to the one argument list it stands for.
+    def resolve(self, actionStr):
+        if not isinstance(actionStr, str):
+            args = self.decodeAction(actionStr)
+            return [args] if (args is not None) and self.isPossible(args[1:], self.templates[actionStr[0]]) else []
+        tableKey = self.syncChanges()
+        if (tableKey is not None) and (tableKey == self.tableKey):
+            return self.table.get(actionStr, [])
+        nameToObjectDict = self.getNameToObjectDict()
+        out = []
+        for template in self.templates:
+            out.extend(template.resolve(actionStr, nameToObjectDict))
+        return out
+
+    # Iterate over (action string, argument list) pairs, in the same order as the classic nested loops
+    # (zero-argument actions, then each object, then each ordered pair of distinct objects, ...)
+    def iterActions(self):
+        incremental = self.syncChanges() is not None
+        entries = self.entries
+        entryKeysByObject = self.entryKeysByObject
+        nameToObjectDict = self.getNameToObjectDict()
+        for arity in sorted(set(template.arity for template in self.templates)):
+            templates = [template for template in self.templates if template.arity == arity]
+            for referents, objs in self.iterArguments(nameToObjectDict, arity):
+                if not (incremental and objs):
+                    yield from self.renderActions(templates, referents, objs)
+                    continue
+                key = (referents, objs)
+                actions = entries.get(key)
+                if actions is None:
+                    actions = self.renderActions(templates, referents, objs)
+                    entries[key] = actions
+                    for obj in objs:
+                        if obj in entryKeysByObject:
+                            entryKeysByObject[obj].add(key)
+                        else:
+                            entryKeysByObject[obj] = set([key])
+                yield from actions
+
+    # Render the actions of the given templates for one tuple of object arguments
+    @staticmethod
+    def renderActions(templates, referents, objs):
+        return [(template.render(objs, referents), [template.verb, *objs]) for template in templates
+                if (template.condition is None) or template.condition(*objs)]
+
+    # Iterate over (referents, objects) for every tuple of `arity` distinct objects
+    @staticmethod
+    def iterArguments(nameToObjectDict, arity):
+        # The common cases are written out, since this is the hot loop when listing every action
+        if arity == 0:
+            yield (), ()
+        elif arity == 1:
+            for referent, objs in nameToObjectDict.items():
+                referents = (referent,)
+                for obj in objs:
+                    yield referents, (obj,)
+        elif arity == 2:
+            items = nameToObjectDict.items()
+            for referent1, objs1 in items:
+                for referent2, objs2 in items:
+                    referents = (referent1, referent2)
+                    for obj1 in objs1:
+                        for obj2 in objs2:
+                            if obj1 is not obj2:
+                                yield referents, (obj1, obj2)
+        else:
+            for items in itertools.product(nameToObjectDict.items(), repeat=arity):
+                referents = tuple(referent for referent, _ in items)
+                for objs in itertools.product(*[objs for _, objs in items]):
+                    if len(set(map(id, objs))) == arity:
+                        yield referents, objs
+
+    #
+    # Encoded actions
+    #
+
+    # Get the id of an object, giving it one if it doesn't have one yet
+    def getObjectId(self, obj):
+        objectId = self.objectIds.get(obj)
+        if objectId is None:
+            objectId = len(self.objectsById)
+            self.objectIds[obj] = objectId
+            self.objectsById.append(obj)
+        return objectId
+
+    # Get the objects that can currently be referred to (those that actions can be about), in listing order
+    def getListedObjects(self):
+        nameToObjectDict = self.getNameToObjectDict()
+        if nameToObjectDict is not self.listedObjectsSource:
+            # (An object with several referents is listed once)
+            self.listedObjects = dict.fromkeys(obj for objs in nameToObjectDict.values() for obj in objs)
+            self.listedObjectsSource = nameToObjectDict
+        return self.listedObjects
+
+    # Check whether an action template is possible for a tuple of object arguments in the current world
+    def isPossible(self, objs, template):
+        listedObjects = self.getListedObjects()
+        if not all(obj in listedObjects for obj in objs) or (len(set(map(id, objs))) < len(objs)):
+            return False
+        return (template.condition is None) or template.condition(*objs)
+
+    # Get every possible action, encoded as integers: the index of its template (see addAction()), followed by the
+    # ids of its object arguments (see getObjectId()), padded with -1 to `encodedWidth` integers.  The codes are
+    # returned back to back in an array (the i-th one is codes[i*width:(i+1)*width]): zero-argument actions first, then
+    # those of each object, then of each ordered pair of distinct objects, ...  An action is listed once, even if its
+    # objects have several referents.  No action strings are rendered.  The array is reused until the world changes,
+    # and must not be modified.
+    def getEncodedActions(self):
+        tableKey = self.syncChanges()
+        if (tableKey is not None) and (tableKey == self.encodedTableKey):
+            return self.encodedTable
+        width = self.encodedWidth
+        codes = array.array("i")
+        listedObjects = list(self.getListedObjects())
+        for arity in sorted(set(template.arity for template in self.templates)):
+            templates = [(templateIdx, template) for templateIdx, template in enumerate(self.templates)
+                         if template.arity == arity]
+            padding = [-1] * (width - 1 - arity)
+            for objs in itertools.product(listedObjects, repeat=arity):
+                if (arity > 1) and (len(set(map(id, objs))) < arity):
+                    continue
+                objectIds = [self.getObjectId(obj) for obj in objs]
+                for templateIdx, template in templates:
+                    if (template.condition is None) or template.condition(*objs):
+                        codes.append(templateIdx)
+                        codes.extend(objectIds)
+                        codes.extend(padding)
+        if tableKey is not None:
+            self.encodedTable = codes
+            self.encodedTableKey = tableKey
+        return codes
+
+    # Get the argument list (e.g. ["put", pot, stove]) that an encoded action stands for, or None if it isn't a valid
+    # code.  (This doesn't check whether the action is possible in the current world.)
+    def decodeAction(self, code):
+        try:
+            code = tuple(code)
+        except TypeError:
+            return None
+        if not code or not (0 <= code[0] < len(self.templates)):
+            return None
+        arity = self.templates[code[0]].arity
+        objectIds = code[1:1+arity]
+        if (len(objectIds) < arity) or not all(0 <= objectId < len(self.objectsById) for objectId in objectIds):
+            return None
+        # (Anything after the object ids is padding)
+        if any(padding != -1 for padding in code[1+arity:]):
+            return None
+        return [self.templates[code[0]].verb] + [self.objectsById[objectId] for objectId in objectIds]
+
+    # Render the action string of an encoded action (with the first referent of each of its objects), e.g. for display
+    def renderAction(self, code):
+        args = self.decodeAction(code)
+        if args is None:
+            return None
+        objs = args[1:]
+        return self.templates[code[0]].render(objs, [obj.getReferents()[0] for obj in objs])
+
+    # Get the codes of the actions that an action string stands for (one for each of its argument lists)
+    def encodeAction(self, actionStr):
+        nameToObjectDict = self.getNameToObjectDict()
+        out = []
+        for templateIdx, template in enumerate(self.templates):
+            for args in template.resolve(actionStr, nameToObjectDict):
+                code = [templateIdx] + [self.getObjectId(obj) for obj in args[1:]]
+                out.append(tuple(code + [-1] * (self.encodedWidth - len(code))))
+        return out
+
+    def __getitem__(self, actionStr):
+        actions = self.resolve(actionStr)
+        if not actions:
+            raise KeyError(actionStr)
+        return actions
+
+    def __contains__(self, actionStr):
+        return len(self.resolve(actionStr)) > 0
+
+    def __iter__(self):
+        return iter(self.getActionTable())
+
+    def __len__(self):
+        return len(self.getActionTable())
+
+    def keys(self):
+        return ActionKeysView(self)
+
+    # Copies share the (immutable) templates, and start with empty caches that are rebuilt on the next listing.  They
+    # keep the ids of objects, so that encoded actions mean the same in a game and its copies.
+    def __deepcopy__(self, memo):
+        actionSpace = ActionSpace(copy.deepcopy(self.game, memo))
+        actionSpace.templates = list(self.templates)
+        actionSpace.conditionProperties = self.conditionProperties
+        actionSpace.encodedWidth = self.encodedWidth
+        actionSpace.objectsById = copy.deepcopy(self.objectsById, memo)
+        actionSpace.objectIds = {obj: objectId for objectId, obj in enumerate(actionSpace.objectsById)}
+        return actionSpace
+
+
+#
+# Goals
+#
+
+# A condition on the objects of a world that the game is scored on.  See GoalSet.addGoal().
+class Goal():
+    def __init__(self, condition, points, forEach, wins, loses):
+        self.condition = condition
+        self.points = points
+        self.forEach = forEach
+        self.wins = wins
+        self.loses = loses
+        # The objects the goal applies to (all of them, without `forEach`), and whether each meets the condition
+        self.results = {}
+        self.numMet = 0
+
+    # Re-check an object that changed (or left the world, if `inWorld` is False)
+    def update(self, obj, inWorld):
+        oldResult = self.results.pop(obj, None)
+        if oldResult:
+            self.numMet -= 1
+        if inWorld and ((self.forEach is None) or self.forEach(obj)):
+            result = bool(self.condition(obj))
+            self.results[obj] = result
+            if result:
+                self.numMet += 1
+
+    # Whether the goal is met: any object meets the condition, or (with `forEach`) all the objects it applies to do
+    def isMet(self):
+        if self.forEach is None:
+            return self.numMet > 0
+        return self.numMet == len(self.results)
+
+    # The points the goal is worth right now
+    def getPoints(self):
+        if self.forEach is None:
+            return self.points if self.numMet > 0 else 0
+        return self.points * self.numMet
+
+
+# The goals of a game, which EngineGame.scoreGoals() scores the game on.
+# Scoring is incremental: each goal remembers its result for every object, and only the objects that changed since
+# the last scoring (entered, left or moved within the world, were renamed, had their contents change, or had a
+# property that a goal depends on written) are checked again.
+class GoalSet():
+    def __init__(self, game):
+        self.game = game
+        self.goals = []
+        # Properties that goal conditions depend on (None if a condition may depend on any property)
+        self.conditionProperties = frozenset(["name", "contains"])
+        # The recorder of changes to the world that the results are kept in sync with
+        self.referentIndex = None
+        self.changes = None
+
+    # Register a goal, e.g. addGoal(lambda obj: obj.name == "steam", wins=True).
+    # A condition is a test on a single object, that may look at its name and properties, which container it's in, and
+    # what it contains (and their names and properties).
+    # Without `forEach`, the goal is met (and worth `points`) when any object in the world meets the condition.  With
+    # `forEach` (a test that picks the objects the goal is about, e.g. every dish), it's worth `points` for each of
+    # those objects that meets the condition, and is met when all of them do.  Meeting a goal with `wins` (or `loses`)
+    # set ends the game.  `dependsOn` lists the properties the tests read (if it isn't given, any property counts).
+    def addGoal(self, condition, points=1, forEach=None, wins=False, loses=False, dependsOn=None):
+        self.goals.append(Goal(condition, points, forEach, wins, loses))
+        if dependsOn is None:
+            self.conditionProperties = None
+        elif self.conditionProperties is not None:
+            self.conditionProperties = self.conditionProperties.union(dependsOn)
+        # Check every object again at the next scoring
+        self.unsubscribe()
+
+    def __len__(self):
+        return len(self.goals)
+
+    def unsubscribe(self):
+        if self.changes is not None:
+            self.referentIndex.unsubscribe(self.changes)
+        self.referentIndex = None
+        self.changes = None
+
+    # Check the objects that changed since the last call against every goal (or every object, the first time)
+    def syncChanges(self):
+        world = self.game.rootObject
+        referentIndex = world.getReferentIndex()
+        if referentIndex is not self.referentIndex:
+            # A new world (e.g. after the game was reset), or new goals
+            self.unsubscribe()
+            self.referentIndex = referentIndex
+            self.changes = ChangeRecorder(self.conditionProperties)
+            referentIndex.subscribe(self.changes)
+            for goal in self.goals:
+                goal.results = {}
+                goal.numMet = 0
+            changedObjects = world.iterContainedObjectsRecursive()
+        else:
+            if not self.changes.changedObjects:
+                return
+            changedObjects = self.changes.popChangedObjects()
+            # A change to an object can also change whether its container meets a condition on its contents
+            for obj in list(changedObjects):
+                if obj.parentContainer is not None:
+                    changedObjects[obj.parentContainer] = None
+        for obj in changedObjects:
+            inWorld = (obj.worldRoot is world) and (obj is not world)
+            for goal in self.goals:
+                goal.update(obj, inWorld)
+
+    # Score the game on its goals.  Returns (score, gameOver, gameWon), where gameOver and gameWon are None unless
+    # a goal that ends the game is met.
+    def evaluate(self):
+        self.syncChanges()
+        score = 0
+        gameOver, gameWon = None, None
+        for goal in self.goals:
+            score += goal.getPoints()
+            if goal.wins and goal.isMet():
+                gameOver, gameWon = True, True
+            elif goal.loses and goal.isMet() and not gameWon:
+                gameOver, gameWon = True, False
+        return (score, gameOver, gameWon)
+
+
+#
+# Copying game state
+#
+
+# Values that can be shared between a game and its copies, rather than copied.  (Functions can be too, unless they
+# capture state, see isShareableFunction().)
+SHARED_TYPES = frozenset([type(None), bool, int, float, complex, str, bytes, range, type, types.BuiltinFunctionType,
+                          types.ModuleType, ActionTemplate])
+
+# Check whether a function can be shared between a game and its copies: it doesn't capture any state in its closure or
+# default arguments.  A closure made by a game (e.g. a lambda that calls one of its methods) captures the game or its
+# objects, and a copy of the game needs a copy of it that captures the copied ones instead.
+def isShareableFunction(function, visited=None):
+    values = list(function.__defaults__ or ()) + list((function.__kwdefaults__ or {}).values())
+    for cell in function.__closure__ or ():
+        try:
+            values.append(cell.cell_contents)
+        except ValueError:
+            # (A variable that isn't bound yet)
+            pass
+    if not values:
+        return True
+    visited = set() if visited is None else visited
+    visited.add(id(function))
+    while values:
+        value = values.pop()
+        cls = type(value)
+        if cls in SHARED_TYPES:
+            continue
+        if cls is tuple:
+            values.extend(value)
+        elif cls is types.FunctionType:
+            if (id(value) not in visited) and not isShareableFunction(value, visited):
+                return False
+        else:
+            return False
+    return True
+
+slotNamesByClass = {}
+
+# Get the names of the slots (other than __dict__ and __weakref__) that instances of a class have
+def getSlotNames(cls):
+    if cls not in slotNamesByClass:
+        slotNames = []
+        for base in cls.__mro__:
+            slots = base.__dict__.get("__slots__", ())
+            for slotName in ([slots] if isinstance(slots, str) else slots):
+                if slotName in ("__dict__", "__weakref__"):
+                    continue
+                # Private names are mangled
+                if slotName.startswith("__") and not slotName.endswith("__"):
+                    slotName = "_" + base.__name__.lstrip("_") + slotName
+                slotNames.append(slotName)
+        slotNamesByClass[cls] = slotNames
+    return slotNamesByClass[cls]
+
+# Check whether instances of a class can be copied attribute by attribute (i.e. they are plain Python objects that
+# don't customize how they are copied or pickled)
+def isPlainClass(cls):
+    return (cls.__new__ in (object.__new__, EngineObject.__new__)) and (cls.__reduce_ex__ is object.__reduce_ex__) and \
+           (cls.__reduce__ is object.__reduce__) and (getattr(cls, "__getstate__", None) is getattr(object, "__getstate__", None)) and \
+           (getattr(cls, "__setstate__", None) in (None, EngineObject.__setstate__)) and not hasattr(cls, "__deepcopy__")
+
+
+# Makes deep copies of game state.  It gives the same result as copy.deepcopy(), but is several times faster on game
+# objects, since it knows how to copy the containers and property stores they are made of directly.  Values it
+# doesn't know about are handed to copy.deepcopy() (with the same memo, so references between them are kept).
+class StateCopier():
+    def __init__(self, memo=None):
+        # id(original) -> copy, for everything copied so far (or that should be replaced by something else)
+        self.memo = {} if memo is None else memo
+
+    def copy(self, value):
+        cls = type(value)
+        if cls in SHARED_TYPES:
+            return value
+        valueCopy = self.memo.get(id(value), self)
+        if valueCopy is not self:
+            return valueCopy
+        copier = COPIERS.get(cls)
+        if copier is None:
+            copier = StateCopier.copyObject if isPlainClass(cls) else StateCopier.copyOther
+            COPIERS[cls] = copier
+        return copier(self, value)
+
+    # Lists and dictionaries are the bulk of what gets copied (e.g. the possible actions of a game), so for their
+    # items, shared values and values that were already copied (such as game objects) are handled here, without a call
+    # to copy().  (A value that isn't in the memo is returned as is by memo.get(), and then checked.)
+    def copyList(self, value):
+        out = []
+        memo = self.memo
+        memo[id(value)] = out
+        memoGet = memo.get
+        copyValue = self.copy
+        out.extend([itemCopy if ((itemCopy := memoGet(id(item), item)) is not item) or (type(item) in SHARED_TYPES)
+                    else copyValue(item) for item in value])
+        return out
+
+    def copyDict(self, value):
+        out = {}
+        memo = self.memo
+        memo[id(value)] = out
+        memoGet = memo.get
+        copyValue = self.copy
+        for key, item in value.items():
+            if type(key) not in SHARED_TYPES:
+                key = copyValue(key)
+            itemCopy = memoGet(id(item), item)
+            if (itemCopy is item) and (type(item) not in SHARED_TYPES):
+                itemCopy = copyValue(item)
+            out[key] = itemCopy
+        return out
+
+    def copyTuple(self, value):
+        items = [self.copy(item) for item in value]
+        # A tuple may have been copied while copying its items (through a reference cycle)
+        if id(value) in self.memo:
+            return self.memo[id(value)]
+        # Tuples of shared values can be shared themselves
+        out = value if all(itemCopy is item for itemCopy, item in zip(items, value)) else tuple(items)
+        self.memo[id(value)] = out
+        return out
+
+    def copySet(self, value):
+        out = type(value)(self.copy(item) for item in value)
+        self.memo[id(value)] = out
+        return out
+
+    def copyMethod(self, value):
+        return types.MethodType(self.copy(value.__func__), self.copy(value.__self__))
+
+    # Functions are shared, unless they capture state (see isShareableFunction()), in which case they are made again
+    # with copies of the values they capture
+    def copyFunction(self, value):
+        if isShareableFunction(value):
+            return value
+        # The cells are made (empty) first, so that the function is in the memo before the values it captures (which may
+        # refer back to it) are copied.  Cells are copied once, so that closures that share a variable still do.
+        memo = self.memo
+        cells = value.__closure__ or ()
+        cellCopies = tuple([memo.get(id(cell)) or types.CellType() for cell in cells])
+        out = types.FunctionType(value.__code__, value.__globals__, value.__name__, None, cellCopies or None)
+        memo[id(value)] = out
+        out.__qualname__ = value.__qualname__
+        for cell, cellCopy in zip(cells, cellCopies):
+            if id(cell) not in memo:
+                memo[id(cell)] = cellCopy
+                try:
+                    cellCopy.cell_contents = self.copy(cell.cell_contents)
+                except ValueError:
+                    # (A variable that isn't bound yet)
+                    pass
+        out.__defaults__ = self.copy(value.__defaults__)
+        out.__kwdefaults__ = self.copy(value.__kwdefaults__)
+        out.__dict__.update(self.copy(value.__dict__))
+        return out
+
+    def copyRandom(self, value):
+        out = random.Random.__new__(random.Random)
+        out.setstate(value.getstate())
+        self.memo[id(value)] = out
+        return out
+
+    # Copy the slots and attributes of a plain Python object (such as a GameObject)
+    def copyObject(self, value):
+        cls = type(value)
+        out = cls.__new__(cls)
+        self.memo[id(value)] = out
+        copyValue = self.copy
+        for slotName in getSlotNames(cls):
+            try:
+                slotValue = getattr(value, slotName)
+            except AttributeError:
+                continue
+            object.__setattr__(out, slotName, copyValue(slotValue))
+        attributes = getattr(value, "__dict__", None)
+        if attributes:
+            outAttributes = out.__dict__
+            for name, attribute in attributes.items():
+                outAttributes[name] = copyValue(attribute)
+        return out
+
+    def copyObjectList(self, value):
+        out = ObjectList(None)
+        self.memo[id(value)] = out
+        copyValue = self.copy
+        list.extend(out, [copyValue(obj) for obj in value])
+        out.owner = copyValue(value.owner)
+        return out
+
+    # The copy starts with an empty tree, which is quicker to rebuild (when first needed) than to copy
+    def copyObjectTree(self, value):
+        out = ObjectTree.__new__(ObjectTree)
+        self.memo[id(value)] = out
+        out.__dict__.update(world=self.copy(value.world), referentIndex=self.copy(value.referentIndex),
+                            baseTraversal=value.baseTraversal, objects=[], ranges={}, generation=None)
+        return out
+
+    def copyPropertyStore(self, value):
+        out = PropertyStore(None)
+        self.memo[id(value)] = out
+        copyValue = self.copy
+        for key in COMMON_PROPERTIES:
+            try:
+                slotValue = getattr(value, key)
+            except AttributeError:
+                continue
+            setattr(out, key, slotValue if type(slotValue) in SHARED_TYPES else copyValue(slotValue))
+        if value.extra is not None:
+            out.extra = self.copyDict(value.extra)
+        out.owner = copyValue(value.owner)
+        return out
+
+    # Copy a dictionary of possible actions ({action string: [[verb, object, ...], ...]}).  These are usually the
+    # largest part of a game's state, so they get a fast path for that shape (any other dictionary is copied as usual).
+    # The argument lists are assumed not to be referenced from anywhere else.
+    def copyActions(self, value):
+        if type(value) is not dict:
+            return self.copy(value)
+        memo = self.memo
+        memoGet = memo.get
+        copyValue = self.copy
+        out = {}
+        memo[id(value)] = out
+        for key, argLists in value.items():
+            if (type(key) is not str) or (type(argLists) is not list):
+                out[key] = copyValue(argLists)
+                continue
+            argListsCopy = []
+            for args in argLists:
+                if type(args) is not list:
+                    argListsCopy.append(copyValue(args))
+                    continue
+                argsCopy = []
+                for arg in args:
+                    # Arguments are usually game objects (copied already) or strings
+                    argCopy = memoGet(id(arg), arg)
+                    if (argCopy is arg) and (type(arg) not in SHARED_TYPES):
+                        argCopy = copyValue(arg)
+                    argsCopy.append(argCopy)
+                argListsCopy.append(argsCopy)
+            out[key] = argListsCopy
+        return out
+
+    # Anything else is copied by copy.deepcopy()
+    def copyOther(self, value):
+        return copy.deepcopy(value, self.memo)
+
+
+COPIERS = {
+    list: StateCopier.copyList,
+    dict: StateCopier.copyDict,
+    tuple: StateCopier.copyTuple,
+    set: StateCopier.copySet,
+    frozenset: StateCopier.copySet,
+    types.MethodType: StateCopier.copyMethod,
+    types.FunctionType: StateCopier.copyFunction,
+    random.Random: StateCopier.copyRandom,
+    ObjectList: StateCopier.copyObjectList,
+    PropertyStore: StateCopier.copyPropertyStore,
+    ObjectTree: StateCopier.copyObjectTree,
+}
+
+
+# Copy the state of a game into another game object (a new, uninitialized one by default), and return it.
+# References to the original game (e.g. from its action space) are replaced by references to the target.
+def copyGame(game, target=None):
+    if target is None:
+        target = type(game).__new__(type(game))
+    copier = StateCopier({id(game): target})
+    # The possible actions are copied last, so that the objects they refer to have been copied already
+    attributes = {name: copier.copy(value) for name, value in game.__dict__.items() if name != "possibleActions"}
+    if "possibleActions" in game.__dict__:
+        attributes["possibleActions"] = copier.copyActions(game.possibleActions)
+    target.__dict__.clear()
+    target.__dict__.update(attributes)
+    return target
+
+
+#
+# Initial states
+#
+
+# Pickles the state of a game, keeping the values that copyGame() shares between a game and its copies (classes,
+# functions, action templates, ...) and random number generators out of the pickle.  Those are stored as numbers, which
+# FrozenState.thaw() looks up.
+class StatePickler(pickle.Pickler):
+    def __init__(self, file, game):
+        pickle.Pickler.__init__(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.game = game
+        self.externalValues = [game]        # The values kept out of the pickle (the game itself is number 0)
+        self.externalNumbers = {}           # id(value) -> its number
+
+    def persistent_id(self, value):
+        if value is self.game:
+            return 0
+        cls = type(value)
+        if cls is types.FunctionType:
+            # A function that captures state can't be shared by the copies (nor pickled), so the state is kept as a
+            # copy instead (see FrozenState)
+            if not isShareableFunction(value):
+                raise pickle.PicklingError(f"{value.__qualname__}() captures state")
+        elif not (((cls in SHARED_TYPES) and (cls not in ATOMIC_TYPES)) or (cls is random.Random)):
+            return None
+        number = self.externalNumbers.get(id(value))
+        if number is None:
+            number = len(self.externalValues)
+            self.externalNumbers[id(value)] = number
+            self.externalValues.append(value)
+        return number
+
+    # Bound methods are pickled as their function and object (like copyGame() copies them), rather than looked up again
+    # by name
+    def reducer_override(self, value):
+        if type(value) is types.MethodType:
+            return (types.MethodType, (value.__func__, value.__self__))
+        return NotImplemented
+
+
+# The state of a game, frozen so that it can be copied into games many times over (see EngineGame.reset()).  The state
+# is pickled once, and each copy is unpickled from it, which is mostly done in C (and is quicker than both initializing
+# a game and copying one with copyGame()).  A state that can't be pickled is kept as a copy instead.
+class FrozenState():
+    def __init__(self, game):
+        self.pickled = None
+        self.snapshot = None
+        try:
+            file = io.BytesIO()
+            pickler = StatePickler(file, game)
+            pickler.dump(game.__dict__)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            self.snapshot = copyGame(game)
+            return
+        self.pickled = file.getvalue()
+        self.externalValues = pickler.externalValues
+        # Each copy gets its own random number generators, in the state they were frozen in
+        self.randomStates = [(number, value.getstate()) for number, value in enumerate(self.externalValues)
+                             if type(value) is random.Random]
+
+    # Copy the frozen state into a game object (a new, uninitialized one by default), and return it
+    def thaw(self, target=None):
+        if self.snapshot is not None:
+            return copyGame(self.snapshot, target)
+        if target is None:
+            target = type(self.externalValues[0]).__new__(type(self.externalValues[0]))
+        externalValues = list(self.externalValues)
+        externalValues[0] = target
+        for number, state in self.randomStates:
+            externalValues[number] = random.Random.__new__(random.Random)
+            externalValues[number].setstate(state)
+        unpickler = pickle.Unpickler(io.BytesIO(self.pickled))
+        unpickler.persistent_load = externalValues.__getitem__
+        attributes = unpickler.load()
+        target.__dict__.clear()
+        target.__dict__.update(attributes)
+        return target
+
+
+# Check whether the state of a game holds a function that captures state (see isShareableFunction()), such as a lambda
+# that calls one of the game's methods, anywhere in its attributes, objects, properties or containers
+def holdsBoundClosures(game):
+    visited = set()
+    values = list(game.__dict__.values())
+    while values:
+        value = values.pop()
+        cls = type(value)
+        if (cls in ATOMIC_TYPES) or (id(value) in visited):
+            continue
+        visited.add(id(value))
+        if cls is types.FunctionType:
+            if not isShareableFunction(value):
+                return True
+        elif cls is types.MethodType:
+            values.extend([value.__func__, value.__self__])
+        elif cls in (list, tuple, set, frozenset, ObjectList):
+            values.extend(value)
+        elif cls is dict:
+            values.extend(value.keys())
+            values.extend(value.values())
+        elif cls is PropertyStore:
+            values.extend(value.values())
+        elif (cls not in SHARED_TYPES) and (cls is not random.Random):
+            values.extend(getattr(value, "__dict__", {}).values())
+            for slotName in getSlotNames(cls):
+                slotValue = getattr(value, slotName, MISSING)
+                if slotValue is not MISSING:
+                    values.append(slotValue)
+    return False
+
+
+# The initial states of games, for each (game class, random seed), oldest first.  The oldest are dropped once there
+# are more than MAX_INITIAL_STATES.
+initialStates = {}
+MAX_INITIAL_STATES = 1024
+
+# Get the initial state of a game class for a random seed, initializing a game to get it the first time.  Returns None
+# for games whose state holds closures (see holdsBoundClosures()): these are only certain to refer to the game they
+# are in when it's initialized afresh.
+def getInitialState(gameClass, randomSeed):
+    key = (gameClass, randomSeed)
+    if key not in initialStates:
+        game = gameClass(randomSeed=randomSeed)
+        initialState = None if holdsBoundClosures(game) else FrozenState(game)
+        if len(initialStates) >= MAX_INITIAL_STATES:
+            del initialStates[next(iter(initialStates))]
+        initialStates[key] = initialState
+    return initialStates[key]
+
+
+#
+# Undo journal
+#
+
+# Stands for an attribute or property that wasn't set
+MISSING = object()
+
+# Attributes of game objects that aren't journaled, since the engine keeps them up to date itself (as the changes that
+# undo a step are made)
+UNJOURNALED_ATTRIBUTES = frozenset(["worldRoot", "indexedReferents", "_engineAsleep", "objectName", "referentIndex",
+                                    "tickScheduler", "objectTree", "accessIndex", "stateVersion"])
+
+# Attributes of game objects that the engine keeps track of itself (through the `name`, `contains` and `properties`
+# setters), or that can't change what an object is called.  Writing any other attribute may change referents.
+ENGINE_ATTRIBUTES = UNJOURNALED_ATTRIBUTES.union(["name", "contains", "properties", "constructorsRun"])
+
+
+# How the values of each class are saved by a journaled step before they can be changed in place (see
+# getJournalKind())
+JOURNAL_CONTENTS = "contents"           # Lists, dictionaries, sets and deques (and their subclasses), by their contents
+JOURNAL_INSTANCE = "instance"           # Instances of other classes (e.g. a game's helper objects), by their attributes
+JOURNAL_RANDOM = "random"               # Random number generators, by their state
+JOURNAL_NESTED = "nested"               # Tuples and frozensets, which can't change, but hold values that can
+
+journalKindByClass = {}
+
+# Get how the values of a class are journaled (see above), or False if they don't need to be: values that can't
+# change, code, game objects, their properties and contents (which journal their own changes), games (whose attributes
+# are saved when a step starts), and the engine's indices and caches (which it keeps up to date itself)
+def getJournalKind(cls):
+    if cls not in journalKindByClass:
+        if (cls in SHARED_TYPES) or issubclass(cls, (EngineObject, EngineGame, PropertyStore, ObjectList, type,
+                                                     types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+                                                     types.ModuleType, ReferentIndex, ObjectTree, TickScheduler,
+                                                     AccessIndex, ChangeRecorder, ActionSpace, GoalSet, StepJournal)):
+            kind = False
+        elif issubclass(cls, (list, dict, set, deque)):
+            kind = JOURNAL_CONTENTS
+        elif issubclass(cls, random.Random):
+            kind = JOURNAL_RANDOM
+        elif issubclass(cls, (tuple, frozenset)):
+            kind = JOURNAL_NESTED
+        elif cls.__dictoffset__ or getSlotNames(cls):
+            kind = JOURNAL_INSTANCE
+        else:
+            kind = False
+        journalKindByClass[cls] = kind
+    return journalKindByClass[cls]
+
+
+# Replaces the __getattribute__() of game objects while a journaled step runs, so that values held in attributes that
+# can be changed in place (lists, dictionaries, sets, helper objects, ...) are saved before they are.  (It is only
+# installed for the duration of the step, so that other attribute reads don't pay for it.  Objects of other games
+# pass through it unrecorded.)
+def journaledGetattribute(obj, name):
+    value = object.__getattribute__(obj, name)
+    cls = type(value)
+    # (Classes that haven't been seen yet are looked up by recordValue())
+    if (cls not in ATOMIC_TYPES) and journalKindByClass.get(cls, True) and (name not in UNJOURNALED_ATTRIBUTES):
+        journal = StepJournal.recording(obj)
+        if journal is not None:
+            journal.recordValue(value)
+    return value
+
+
+# Records what each step of a game changes, so that steps can be taken back (most recent first) with undo().
+# While a step runs, every write to a property or attribute of a game object, every change to a `contains` list, and
+# every in-place change to a value held in a property or attribute (or nested in one) saves what it replaces: the
+# contents of lists, dictionaries and sets, the attributes of other objects (e.g. a game's helper objects), and the
+# state of random number generators.  The game's own attributes (score, flags, observation, step count, ...), the
+# values they hold, and its random number generator state are saved when the step starts.  Taking a step back then
+# makes only the changes it needs to, in time proportional to what the step changed.
+#
+# Changes to values that the game can't reach (e.g. module globals, class attributes, or values only held by a
+# function's closure) aren't journaled, and aren't taken back.  Neither are changes to the objects of other games.
+class StepJournal():
+    # The journal that is recording the step being run, if any
+    active = None
+
+    def __init__(self, game):
+        self.game = game
+        self.baseStep = type(game).step         # The game's step(), which journaled steps run
+        self.steps = []                         # (game attributes, random state, entries) for each step, most recent last
+        self.entries = None                     # (undo function, target, key, value) for each change of the current step
+        self.savedValues = None                 # ids of the in-place changeable values saved during the current step
+        self.world = None                       # The root of the game's world during the current step
+
+    # Get the journal recording the current step, if a game object belongs to its game (i.e. it isn't in the world of
+    # another game), or None
+    @staticmethod
+    def recording(obj):
+        journal = StepJournal.active
+        if (journal is not None) and (obj is not None):
+            world = object.__getattribute__(obj, "worldRoot")
+            if world is None:
+                # (Worlds that haven't been indexed don't set it, so the object's outermost container is found instead.
+                # A game may have put an object in itself.)
+                containers = [obj]
+                while True:
+                    try:
+                        container = object.__getattribute__(containers[-1], "parentContainer")
+                    except AttributeError:
+                        container = None
+                    if (container is None) or any(container is seen for seen in containers):
+                        break
+                    containers.append(container)
+                world = containers[-1]
+                if not issubclass(type(world), EngineWorld):
+                    return journal
+            if world is not journal.world:
+                return None
+        return journal
+
+    # Take a step of the game (with the same arguments as its step()), journaling the changes it makes.  A step that
+    # raises an exception is journaled as far as it got, so it can be taken back too.
+    def step(self, *args, **kwargs):
+        # (A step taken from within another step is part of the outer one)
+        if StepJournal.active is not None:
+            return self.baseStep(self.game, *args, **kwargs)
+
+        game = self.game
+        generator = game.__dict__.get("random")
+        randomState = generator.getstate() if type(generator) is random.Random else None
+        self.entries = []
+        # (The game's generator is saved with its attributes)
+        self.savedValues = set([id(generator)])
+        self.world = game.__dict__.get("rootObject")
+        attributes = dict(game.__dict__)
+        self.steps.append((attributes, randomState, self.entries))
+        # The values the game holds itself (e.g. a log of what the player did, or a helper object) may be changed in
+        # place, and aren't read through a game object, so they are saved up front (caches and the like are left out)
+        self.recordNestedValues([value for name, value in attributes.items() if name not in UNFINGERPRINTED_ATTRIBUTES])
+
+        StepJournal.active = self
+        EngineObject.__getattribute__ = journaledGetattribute
+        try:
+            return self.baseStep(game, *args, **kwargs)
+        finally:
+            del EngineObject.__getattribute__
+            StepJournal.active = None
+            self.entries = None
+            self.savedValues = None
+            self.world = None
+
+    def recordProperty(self, properties, key):
+        if key in COMMON_PROPERTY_NAMES:
+            value = getattr(properties, key, MISSING)
+        else:
+            value = MISSING if properties.extra is None else properties.extra.get(key, MISSING)
+        self.entries.append((StepJournal.undoProperty, properties, key, value))
+
+    def recordContents(self, objectList):
+        self.entries.append((StepJournal.undoContents, objectList, None, list(objectList)))
+
+    # Save a value that can be changed in place (see getJournalKind()) before it is first changed during this step,
+    # along with the values nested in it (which can be changed through it without being journaled)
+    def recordValue(self, value):
+        if id(value) in self.savedValues:
+            return
+        kind = getJournalKind(type(value))
+        if not kind:
+            return
+        self.savedValues.add(id(value))
+        if kind is JOURNAL_CONTENTS:
+            self.entries.append((StepJournal.undoValue, value, None, list(value) if isinstance(value, deque) else value.copy()))
+            self.recordNestedValues(value.values() if isinstance(value, dict) else value)
+        elif kind is JOURNAL_INSTANCE:
+            slotValues = [(slotName, getattr(value, slotName, MISSING)) for slotName in getSlotNames(type(value))]
+            attributes = getattr(value, "__dict__", None)
+            attributes = None if attributes is None else dict(attributes)
+            self.entries.append((StepJournal.undoInstance, value, None, (attributes, slotValues)))
+            self.recordNestedValues([slotValue for _, slotValue in slotValues])
+            if attributes:
+                self.recordNestedValues(attributes.values())
+        elif kind is JOURNAL_RANDOM:
+            self.entries.append((StepJournal.undoRandom, value, None, value.getstate()))
+        else:
+            self.recordNestedValues(value)
+
+    def recordNestedValues(self, items):
+        for item in items:
+            if type(item) not in ATOMIC_TYPES:
+                self.recordValue(item)
+
+    # Take back the most recent journaled step.  Returns False if there is no step to take back.
+    def undo(self):
+        if not self.steps:
+            return False
+        attributes, randomState, entries = self.steps.pop()
+        # The changes are taken back in the reverse order they were made in, through the usual properties and lists, so
+        # that the world's indices are kept up to date as they would be by the step itself
+        for undoEntry, target, key, value in reversed(entries):
+            undoEntry(target, key, value)
+
+        game = self.game
+        game.__dict__.clear()
+        game.__dict__.update(attributes)
+        if randomState is not None:
+            game.random.setstate(randomState)
+        return True
+
+    @staticmethod
+    def undoAttribute(obj, name, value):
+        if value is not MISSING:
+            setattr(obj, name, value)
+        elif hasattr(obj, name):
+            delattr(obj, name)
+
+    @staticmethod
+    def undoProperty(properties, key, value):
+        if value is not MISSING:
+            properties[key] = value
+        elif key in properties:
+            del properties[key]
+
+    @staticmethod
+    def undoContents(objectList, key, objs):
+        objectList[:] = objs
+
+    @staticmethod
+    def undoValue(value, key, contents):
+        if isinstance(value, list):
+            value[:] = contents
+        elif isinstance(value, deque):
+            value.clear()
+            value.extend(contents)
+        else:
+            value.clear()
+            value.update(contents)
+
+    @staticmethod
+    def undoInstance(value, key, state):
+        attributes, slotValues = state
+        for slotName, slotValue in slotValues:
+            if slotValue is not MISSING:
+                object.__setattr__(value, slotName, slotValue)
+            elif hasattr(value, slotName):
+                object.__delattr__(value, slotName)
+        if attributes is not None:
+            value.__dict__.clear()
+            value.__dict__.update(attributes)
+
+    @staticmethod
+    def undoRandom(generator, key, state):
+        generator.setstate(state)
+
+
+#
+# Expansion
+#
+
+# A child of an expanded state (the state after taking one of the actions from it).  The state it was expanded from is
+# frozen once and shared by all its children, so a child is only copied into a game of its own when it's asked for.
+class ChildState():
+    def __init__(self, parentState, action):
+        self.parentState = parentState
+        self.action = action
+
+    # Make a game in this state (a new, uninitialized one by default), and return it
+    def thaw(self, target=None):
+        game = self.parentState.thaw(target)
+        game.step(self.action)
+        return game
+
+
+# Take each action from the current state of a game, taking each back before the next.  Returns (action, observation,
+# score, game over, game won, child state) for each action, in order.  An action that raises an exception is taken
+# back before the exception is passed on.  A step may change something that its journal can't take back (see
+# StepJournal), which would leak into the next action, so the game is thawed back into its frozen state whenever its
+# fingerprint isn't the same after taking an action back.
+def expandGame(game, actions):
+    # The game's own undo journal (if any) is set aside, so that it isn't part of the frozen state
+    attributes = game.__dict__
+    ownJournal = attributes.pop("undoJournal", None)
+    ownStep = attributes.pop("step", None)
+    try:
+        parentState = FrozenState(game)
+        parentFingerprint = getStateFingerprint(game)
+        journal = StepJournal(game)
+        out = []
+        for action in actions:
+            try:
+                observationStr, score, _, gameOver, gameWon = journal.step(action)
+            finally:
+                journal.undo()
+                if getStateFingerprint(game) != parentFingerprint:
+                    parentState.thaw(game)
+            out.append((action, observationStr, score, gameOver, gameWon, ChildState(parentState, action)))
+        return out
+    finally:
+        if ownJournal is not None:
+            attributes["undoJournal"] = ownJournal
+            attributes["step"] = ownStep
+
+
+#
+# State fingerprints
+#
+
+# Attributes that aren't part of the state of a game: caches and indices derived from the rest of the state, and
+# things that describe how the state was reached rather than what it is (the last observation, the step count, the
+# undo journal).  The step count is part of the state of games that read it (see readsStepCount()).
+UNFINGERPRINTED_ATTRIBUTES = frozenset(["possibleActions", "actionSpace", "goalSet", "nameToObjectDict",
+                                        "nameToObjectDictKey", "referentIndex", "tickScheduler", "objectTree",
+                                        "accessIndex", "stateVersion", "observationStr", "numSteps", "undoJournal", "step"])
+
+ATOMIC_TYPES = frozenset([type(None), bool, int, float, complex, str, bytes])
+
+stepCountReadersByClass = {}
+
+# Check whether a game reads its step count (e.g. to end after some number of steps), anywhere other than to add to it.
+# Then states reached in different numbers of steps may play out differently, so the count is part of their
+# fingerprint.  The methods of the classes in the game's module (other than other games) are checked, since any of its
+# objects may read the count from the game.  Its functions aren't, such as a main() that prints the count.
+def readsStepCount(gameClass):
+    if gameClass not in stepCountReadersByClass:
+        module = sys.modules.get(gameClass.__module__)
+        classes = [cls for cls in vars(module).values()
+                   if isinstance(cls, type) and (cls.__module__ == gameClass.__module__)] if module else [gameClass]
+        classes = [cls for cls in classes if (cls in gameClass.__mro__) or not issubclass(cls, EngineGame)]
+        codes = []
+        for cls in classes:
+            for value in vars(cls).values():
+                if isinstance(value, (staticmethod, classmethod)):
+                    value = value.__func__
+                functions = [value.fget, value.fset] if isinstance(value, property) else [value]
+                codes.extend([function.__code__ for function in functions if isinstance(function, types.FunctionType)])
+        stepCountReadersByClass[gameClass] = any(codeReadsStepCount(code) for code in codes)
+    return stepCountReadersByClass[gameClass]
+
+# Check whether compiled code (or any function or lambda nested in it) reads `numSteps`.  Each `numSteps += n` reads it
+# once, which isn't counted.
+def codeReadsStepCount(code):
+    instructions = list(dis.get_instructions(code))
+    numReads = 0
+    for i, instruction in enumerate(instructions):
+        if instruction.argval != "numSteps":
+            continue
+        if instruction.opname == "STORE_ATTR":
+            # (The in-place operation is at most a few instructions before the store, depending on the Python version)
+            if any(prior.opname.startswith("INPLACE_") or
+                   ((prior.opname == "BINARY_OP") and prior.argrepr.endswith("="))
+                   for prior in instructions[max(0, i - 3):i]):
+                numReads -= 1
+        elif instruction.opname in ("LOAD_ATTR", "LOAD_METHOD", "LOAD_CONST"):
+            # Reading the attribute, or its name (e.g. for getattr())
+            numReads += 1
+    if numReads > 0:
+        return True
+    return any(codeReadsStepCount(const) for const in code.co_consts if isinstance(const, types.CodeType))
+
+
+# Encodes the state of a game as nested tuples of plain values, which are equal for equal states no matter how they
+# were reached, or which Python objects make them up.  Game objects (and other instances, such as a game's helper
+# objects) are encoded where they are first reached (walking the world from its root, then the game's other
+# attributes, in order), and as ("@", N) for the N-th object after that, so objects that refer to each other are
+# encoded once.
+class StateEncoder():
+    def __init__(self, game):
+        self.game = game
+        self.objectNumbers = {}         # id(game object or instance) -> the order it was first reached in
+
+    def encodeGame(self):
+        game = self.game
+        out = [type(game).__name__, self.encode(game.rootObject)]
+        attributes = game.__dict__
+        for name in sorted(attributes):
+            if name not in UNFINGERPRINTED_ATTRIBUTES:
+                out.append((name, self.encode(attributes[name])))
+        if readsStepCount(type(game)):
+            out.append(("numSteps", attributes.get("numSteps")))
+        return tuple(out)
+
+    def encode(self, value):
+        cls = type(value)
+        if cls in ATOMIC_TYPES:
+            return value
+        if id(value) in self.objectNumbers:
+            return ("@", self.objectNumbers[id(value)])
+        if value is self.game:
+            return ("game",)
+        if cls in (list, tuple, ObjectList):
+            return tuple([self.encode(item) for item in value])
+        if cls is dict:
+            # Dictionaries (and sets) are encoded in a canonical order, since they may have been filled in any order
+            return ("dict",) + tuple(sorted(((self.encode(key), self.encode(item)) for key, item in value.items()), key=repr))
+        if cls in (set, frozenset):
+            return ("set",) + tuple(sorted((self.encode(item) for item in value), key=repr))
+        if cls is PropertyStore:
+            return self.encodeProperties(value)
+        if cls is random.Random:
+            # The generator state is a few hundred integers, which are much quicker to hash than to print
+            version, internalState, gaussNext = value.getstate()
+            digest = hashlib.blake2b(struct.pack("%dI" % len(internalState), *internalState), digest_size=16).hexdigest()
+            return ("random", version, digest, gaussNext)
+        if isinstance(value, (type, types.FunctionType, types.BuiltinFunctionType, types.MethodType, types.ModuleType)):
+            return ("code", getattr(value, "__qualname__", getattr(value, "__name__", repr(value))))
+        if isinstance(value, EngineObject):
+            return self.encodeGameObject(value)
+        return self.encodeInstance(value)
+
+    # The common properties are encoded by position, with Ellipsis for the ones that aren't set
+    def encodeProperties(self, properties):
+        out = [getattr(properties, key, Ellipsis) for key in COMMON_PROPERTIES]
+        for i, propertyValue in enumerate(out):
+            if type(propertyValue) not in ATOMIC_TYPES and propertyValue is not Ellipsis:
+                out[i] = self.encode(propertyValue)
+        if properties.extra:
+            for key in sorted(properties.extra):
+                out.append((key, self.encode(properties.extra[key])))
+        return tuple(out)
+
+    def encodeGameObject(self, obj):
+        self.objectNumbers[id(obj)] = len(self.objectNumbers)
+        out = [type(obj).__name__, obj.name, self.encodeProperties(obj.properties)]
+        # (Attributes that aren't part of the state, such as a world's indices, may come and go, e.g. when an index is
+        # made during a step that is then undone)
+        attributes = obj.__dict__
+        out.append(tuple([(name, self.encode(attributes[name])) for name in sorted(attributes)
+                          if name not in UNFINGERPRINTED_ATTRIBUTES]))
+        out.append(tuple([self.encode(containedObj) for containedObj in obj.contains]))
+        # The container is implied by where an object is encoded, except for objects that aren't in their container's
+        # contents (e.g. the sides of a balance scale)
+        parent = obj.parentContainer
+        if (parent is not None) and (id(parent) in self.objectNumbers) and (obj not in parent.contains):
+            out.append(("in", self.encode(parent)))
+        return tuple(out)
+
+    def encodeInstance(self, value):
+        self.objectNumbers[id(value)] = len(self.objectNumbers)
+        out = [type(value).__name__]
+        for slotName in getSlotNames(type(value)):
+            if hasattr(value, slotName):
+                out.append((slotName, self.encode(getattr(value, slotName))))
+        attributes = getattr(value, "__dict__", {})
+        for name in sorted(attributes):
+            out.append((name, self.encode(attributes[name])))
+        return tuple(out)
+
+
+# Get a fingerprint (a hex string) of the state of a game, that is the same for equal states
+def getStateFingerprint(game):
+    encoded = StateEncoder(game).encodeGame()
+    return hashlib.blake2b(repr(encoded).encode("utf-8"), digest_size=16).hexdigest()
+
+
+#
+# Engine base classes
+#
+
+objectBaseClassByClass = {}
+customReferentsByClass = {}
+skipsAsleepTicksByClass = {}
+
+# Get the class that a class of game objects is built on (the one that EngineObject is the base of, i.e. GameObject),
+# whose tick(), getReferents() and getAllContainedObjectsRecursive() are the defaults that other classes override
+def getObjectBaseClass(cls):
+    if cls not in objectBaseClassByClass:
+        mro = cls.__mro__
+        objectBaseClassByClass[cls] = mro[mro.index(EngineObject) - 1]
+    return objectBaseClassByClass[cls]
+
+# Check whether objects of a class have custom referents (e.g. "dirty cup"), which can change when a property does
+def hasCustomReferents(cls):
+    if cls not in customReferentsByClass:
+        customReferentsByClass[cls] = cls.getReferents is not getObjectBaseClass(cls).getReferents
+    return customReferentsByClass[cls]
+
+# Check whether a game can let the ticks after its world falls asleep pass all at once (see EngineGame.advance()):
+# those ticks only change its step count, as long as its doWorldTick() and calculateScore() are the defaults of the
+# class it's built on (i.e. TextGame), and it doesn't read the step count (see readsStepCount())
+def skipsAsleepTicks(gameClass):
+    if gameClass not in skipsAsleepTicksByClass:
+        mro = gameClass.__mro__
+        baseClass = mro[mro.index(EngineGame) - 1]
+        skipsAsleepTicksByClass[gameClass] = (gameClass.doWorldTick is baseClass.doWorldTick) and \
+                                             (gameClass.calculateScore is baseClass.calculateScore) and \
+                                             not readsStepCount(gameClass)
+    return skipsAsleepTicksByClass[gameClass]
+
+
+# The base of GameObject.  It keeps the engine's bookkeeping (the world an object is in, the referents it's indexed
+# under, ...) in slots, and tells the world's indices when the object is renamed, has a property written, or has its
+# contents changed.
+class EngineObject():
+    # The core fields are kept in slots to make objects smaller (subclasses can still add any attributes they like)
+    __slots__ = ("__dict__", "__weakref__", "constructorsRun", "worldRoot", "indexedReferents", "objectName",
+                 "parentContainer", "_objectList", "_propertyStore", "_engineAsleep")
+
+    # The engine's fields are set before any constructor runs, since a subclass may set the name before calling
+    # GameObject's constructor
+    def __new__(cls, *args, **kwargs):
+        obj = object.__new__(cls)
+        # The World this object is (recursively) contained in, if any, and the referents it is indexed under there.
+        # Both are maintained by the world's referent index.
+        object.__setattr__(obj, "worldRoot", None)
+        object.__setattr__(obj, "indexedReferents", ())
+        # The name is stored in `objectName`, behind the `name` property below
+        object.__setattr__(obj, "objectName", None)
+        # Whether tick() is skipped until one of this object's properties changes (see sleep())
+        object.__setattr__(obj, "_engineAsleep", False)
+        return obj
+
+    # Attribute writes are journaled while a journaled step runs (see StepJournal), and may change the referents of
+    # objects in the world (see ReferentIndex.markAttributeChanged())
+    def __setattr__(self, name, value):
+        if (StepJournal.active is not None) and (name not in UNJOURNALED_ATTRIBUTES):
+            journal = StepJournal.recording(self)
+            if journal is not None:
+                journal.entries.append((StepJournal.undoAttribute, self, name, getattr(self, name, MISSING)))
+        object.__setattr__(self, name, value)
+        if (name not in ENGINE_ATTRIBUTES) and (self.worldRoot is not None):
+            self.worldRoot.getReferentIndex().markAttributeChanged()
+
+    # Unpickled objects have their slots set directly, since the world they refer to is only half restored by then
+    def __setstate__(self, state):
+        attributes, slots = state if isinstance(state, tuple) else (state, None)
+        if attributes:
+            self.__dict__.update(attributes)
+        if slots:
+            for name, value in slots.items():
+                object.__setattr__(self, name, value)
+
+    # The object's name.  Renaming an object (e.g. water turning into steam) updates the world's referent index.
+    @property
+    def name(self):
+        return self.objectName
+
+    @name.setter
+    def name(self, name):
+        if self.objectName == name:
+            return
+        self.objectName = name
+        if self.worldRoot is not None:
+            self._engineAsleep = False
+            self.worldRoot.stateVersion += 1
+            referentIndex = self.worldRoot.getReferentIndex()
+            referentIndex.markDirty(self)
+            referentIndex.recordPropertyChange(self, "name")
+            # Some objects are referred to by the name of their container (e.g. "water in pot")
+            for obj in self.contains:
+                referentIndex.markDirty(obj)
+
+    # Replace the object's contents.  A list (or any other iterable, such as another object's contents) is made into an
+    # ObjectList of its objects, and the objects that left or entered are reported as for any other change of contents.
+    def setContains(self, objs):
+        oldObjs = getattr(self, "_objectList", None)
+        if objs is oldObjs:
+            return
+        if (type(objs) is not ObjectList) or (objs.owner is not None and objs.owner is not self):
+            objs = ObjectList(None, objs)
+        # (The old list no longer reports changes to this object, but can be put back, e.g. by undo())
+        if oldObjs is not None:
+            oldObjs.owner = None
+        objs.owner = self
+        object.__setattr__(self, "_objectList", objs)
+        if self.worldRoot is not None:
+            self.onContentsChanged(objs, () if oldObjs is None else oldObjs)
+
+    # (Only undo() deletes them, when it takes back the step an object was made in)
+    def deleteContains(self):
+        object.__delattr__(self, "_objectList")
+
+    # The objects this object contains (an ObjectList, read straight from its slot)
+    contains = property(operator.attrgetter("_objectList"), setContains, deleteContains)
+
+    # Replace the object's properties.  A dictionary (or any other mapping, such as another object's properties) is
+    # made into a PropertyStore of its items, and every property that was set before or after counts as written.
+    def setProperties(self, properties):
+        oldProperties = getattr(self, "_propertyStore", None)
+        if properties is oldProperties:
+            return
+        if (type(properties) is not PropertyStore) or (properties.owner is not None and properties.owner is not self):
+            propertyStore = PropertyStore(None)
+            for key, value in properties.items():
+                propertyStore[key] = value
+            properties = propertyStore
+        # (The old store no longer tells this object about writes to it, but can be put back, e.g. by undo())
+        if oldProperties is not None:
+            oldProperties.owner = None
+        properties.owner = self
+        object.__setattr__(self, "_propertyStore", properties)
+        if self.worldRoot is not None:
+            for propertyName in dict.fromkeys(itertools.chain(oldProperties or (), properties)):
+                self.onPropertyChanged(propertyName)
+
+    # (Only undo() deletes them, when it takes back the step an object was made in)
+    def deleteProperties(self):
+        object.__delattr__(self, "_propertyStore")
+
+    # The object's properties (a PropertyStore, read straight from its slot)
+    properties = property(operator.attrgetter("_propertyStore"), setProperties, deleteProperties)
+
+    # Called whenever a property of this object is written
+    def onPropertyChanged(self, propertyName):
+        if self.worldRoot is None:
+            return
+        self._engineAsleep = False
+        self.worldRoot.stateVersion += 1
+        referentIndex = self.worldRoot.getReferentIndex()
+        referentIndex.recordPropertyChange(self, propertyName)
+        # Only objects with custom referents can have their referents changed by a property
+        if hasCustomReferents(type(self)):
+            referentIndex.markDirty(self)
+
+    # Called whenever objects are added to or removed from this object's contents
+    def onContentsChanged(self, added, removed):
+        if self.worldRoot is None:
+            return
+        self.worldRoot.stateVersion += 1
+        referentIndex = self.worldRoot.getReferentIndex()
+        # Any change of contents changes the order of objects in the world.  This is noted first, since attaching and
+        # detaching objects lists their contents.
+        referentIndex.markReordered()
+        referentIndex.recordPropertyChange(self, "contains")
+        for obj in removed:
+            # The same object may (unusually) be listed more than once
+            if obj not in self.contains:
+                referentIndex.detach(obj)
+        for obj in added:
+            referentIndex.attach(obj)
+
+    # Iterate over all contained objects, recursively, without making a list of them (when possible).  Like a list
+    # from getAllContainedObjectsRecursive(), the iteration isn't affected by objects being moved during it.
+    def iterContainedObjectsRecursive(self):
+        if self.worldRoot is not None:
+            containedObjects = self.worldRoot.getObjectTree().iterContainedObjects(self)
+            if containedObjects is not None:
+                return containedObjects
+        return iter(self.getAllContainedObjectsRecursive())
+
+    # Skip this object's tick() until one of its properties changes (or it is renamed).  An object can call this from
+    # tick() when it has nothing to do until then (e.g. a stove that is off does nothing until it is turned on).
+    def sleep(self):
+        self._engineAsleep = True
+
+
+# Mixed into World (the root of a world), which owns the indices of the objects in it.  Each index is made on first
+# use.
+class EngineWorld():
+    __slots__ = ()
+
+    # Bumped whenever anything in the world changes (an object is added, removed, renamed, or has a property written)
+    stateVersion = 0
+
+    # Get the index from referents to the objects in this world
+    def getReferentIndex(self):
+        if "referentIndex" not in self.__dict__:
+            self.worldRoot = self
+            self.referentIndex = ReferentIndex(self)
+        return self.referentIndex
+
+    # Get the objects in the world that can be referred to by a given name.  This is a constant-time lookup that
+    # doesn't allocate; the returned list is owned by the index, and must not be modified.
+    def getObjectsByReferent(self, referent):
+        return self.getReferentIndex().lookup(referent)
+
+    # Get the flattened tree of the objects in this world
+    def getObjectTree(self):
+        if "objectTree" not in self.__dict__:
+            self.objectTree = ObjectTree(self, getObjectBaseClass(type(self)).getAllContainedObjectsRecursive)
+        return self.objectTree
+
+    # Get the scheduler that keeps track of which objects in this world need ticking
+    def getTickScheduler(self):
+        if "tickScheduler" not in self.__dict__:
+            self.tickScheduler = TickScheduler(self, getObjectBaseClass(type(self)).tick)
+        return self.tickScheduler
+
+    # Get the index of which containers the objects in this world are in, and whether they can be reached
+    def getAccessIndex(self):
+        if "accessIndex" not in self.__dict__:
+            self.accessIndex = AccessIndex(self)
+        return self.accessIndex
+
+    # The objects in the world are listed from its flattened object tree, which is only redone when the world changes
+    def getAllContainedObjectsRecursive(self):
+        containedObjects = self.getObjectTree().getContainedObjects(self)
+        if containedObjects is not None:
+            return containedObjects
+        return super().getAllContainedObjectsRecursive()
+
+
+# The base of TextGame.  It provides the game's action space, cached lookups of objects by name and of which objects can
+# be reached, ticking only the objects that need it, and snapshots, undo and expansion for search code.
+class EngineGame():
+    # Cache for makeNameToObjectDict()
+    nameToObjectDict = None
+    nameToObjectDictKey = None
+
+    # Get the game's action space, which action templates are registered with (e.g.
+    # self.getActionSpace().addAction("put {0} {1.prefix} {1}", "put") in registerActions()).
+    # generatePossibleActions() can then simply return it.
+    def getActionSpace(self):
+        if "actionSpace" not in self.__dict__:
+            self.actionSpace = ActionSpace(self)
+        return self.actionSpace
+
+    # Get the game's goals, which registerGoals() adds to (e.g. self.getGoalSet().addGoal(lambda obj: obj.name ==
+    # "steam", wins=True)).  The goal set is made, and registerGoals() called, on first use.
+    def getGoalSet(self):
+        if "goalSet" not in self.__dict__:
+            self.goalSet = GoalSet(self)
+            self.registerGoals()
+        return self.goalSet
+
+    # Register the goals the game is scored on (see getGoalSet())
+    def registerGoals(self):
+        pass
+
+    # Score the game on its registered goals, for calculateScore() to call: the score is the points of the goals met,
+    # and the game ends once a goal that wins (or loses) it is met.  Only the objects that changed since the last call
+    # are checked again.
+    def scoreGoals(self):
+        score, gameOver, gameWon = self.getGoalSet().evaluate()
+        self.score = score
+        if gameOver:
+            self.gameOver, self.gameWon = gameOver, gameWon
+
+    #
+    #   Cached lookups
+    #
+
+    # Get the dictionary that makeNameToObjectDict() last made, if no object has entered, left, moved within, or been
+    # renamed in the world since (or None)
+    def getCachedNameToObjectDict(self):
+        cacheKey = self.getNameToObjectDictKey()
+        if (cacheKey is not None) and (cacheKey == self.nameToObjectDictKey):
+            return self.nameToObjectDict
+        return None
+
+    # Keep a dictionary made by makeNameToObjectDict(), until the world changes
+    def cacheNameToObjectDict(self, nameToObjectDict):
+        cacheKey = self.getNameToObjectDictKey()
+        if cacheKey is not None:
+            self.nameToObjectDict = nameToObjectDict
+            self.nameToObjectDictKey = cacheKey
+
+    def getNameToObjectDictKey(self):
+        getReferentIndex = getattr(self.rootObject, "getReferentIndex", None)
+        if getReferentIndex is None:
+            return None
+        referentIndex = getReferentIndex()
+        return (referentIndex, referentIndex.getGeneration())
+
+    # Get the containers an object is (recursively) in, innermost first -- e.g. (fridge, kitchen) for milk in a fridge
+    def pathToRoot(self, obj):
+        if (obj.worldRoot is self.rootObject) and hasattr(self.rootObject, "getAccessIndex"):
+            return self.rootObject.getAccessIndex().pathToRoot(obj)
+        path = []
+        while obj.parentContainer != None:
+            obj = obj.parentContainer
+            path.append(obj)
+        return tuple(path)
+
+    # Check whether an object can be reached: it's in the world, and none of the containers it's in is closed (e.g. not
+    # milk in a closed fridge, or in a box in a closed fridge)
+    def isAccessible(self, obj):
+        if (obj.worldRoot is self.rootObject) and hasattr(self.rootObject, "getAccessIndex"):
+            return self.rootObject.getAccessIndex().isAccessible(obj)
+        path = (obj,) + self.pathToRoot(obj)
+        if path[-1] is not self.rootObject:
+            return False
+        return not any(container.getProperty("isOpen") == False for container in path[1:])
+
+    #
+    #   Ticking
+    #
+
+    # Iterate over the objects to tick, in order: those that do something when ticked (a world keeps this list up to
+    # date as objects move, rather than collecting every object on every step), skipping those that are asleep.  Each
+    # object is checked when it's reached, so one that is woken by an earlier object's tick() is still ticked.
+    def iterObjectsToTick(self):
+        getTickScheduler = getattr(self.rootObject, "getTickScheduler", None)
+        if getTickScheduler is not None:
+            allObjects = getTickScheduler().getTickingObjects()
+        else:
+            allObjects = self.rootObject.getAllContainedObjectsRecursive()
+        return (obj for obj in allObjects if not obj._engineAsleep)
+
+    # Let up to n ticks of the world pass without the player doing anything (as when waiting for water to boil), without
+    # describing the world or listing the possible actions in between.  Stops early once the game is over or the score
+    # changes, and returns the number of ticks that passed.
+    def advance(self, n):
+        lastScore = self.score
+        for tick in range(n):
+            self.numSteps += 1
+            self.doWorldTick()
+            self.calculateScore()
+            if self.gameOver or (self.score != lastScore):
+                return tick + 1
+            # Once every object that ticks is asleep, later ticks don't change anything but the step count (unless
+            # the game does more than tick its objects, or reads the count), so they are all passed at once
+            if skipsAsleepTicks(type(self)) and self.isWorldAsleep():
+                self.numSteps += n - (tick + 1)
+                return n
+        return n
+
+    # Check whether every object in the world that does something when ticked is asleep (a world where nothing ticks
+    # isn't asleep)
+    def isWorldAsleep(self):
+        getTickScheduler = getattr(self.rootObject, "getTickScheduler", None)
+        if getTickScheduler is None:
+            return False
+        tickingObjects = getTickScheduler().getTickingObjects()
+        return bool(tickingObjects) and all(obj._engineAsleep for obj in tickingObjects)
+
+    #
+    #   Snapshots
+    #
+
+    # Start the game over, in the same state as a new game made with the given random seed.  The initial state for each
+    # seed is kept after it is first made, so resetting to it again is a quick copy rather than initializing the world.
+    # (Games whose state holds closures, such as lambdas that call the game's methods, are initialized again instead.)
+    def reset(self, randomSeed):
+        initialState = getInitialState(type(self), randomSeed)
+        if initialState is None:
+            self.__dict__.clear()
+            type(self).__init__(self, randomSeed=randomSeed)
+        else:
+            initialState.thaw(self)
+
+    # Make an independent copy of the game (its object tree, score and flags, and random number generator state).
+    # This is much faster than copy.deepcopy(), so search code can branch from a game instead of replaying actions.
+    def clone(self):
+        return copyGame(self)
+
+    # Save the current state of the game, so that it can be returned to later with restore()
+    def snapshot(self):
+        return copyGame(self)
+
+    # Return to a state saved with snapshot().  The snapshot itself is left unchanged, so it can be restored again.
+    # Any game objects held from before the call belong to the old state, and should be looked up again.
+    def restore(self, snapshot):
+        copyGame(snapshot, self)
+
+    # Get a short string identifying the current state of the game (where every object is, what it's called and its
+    # properties, the score and flags, and the random number generator state).  Games that reach the same state by
+    # different actions have the same fingerprint, so search code can use it to skip states it has already explored.
+    # (The step count is only part of the state of games that read it, see readsStepCount().)
+    def stateFingerprint(self):
+        return getStateFingerprint(self)
+
+    # Start (or stop) keeping a journal of the changes each step() makes, so that steps can be taken back with undo().
+    # This is much cheaper than a snapshot before every step, so search code can explore from a single game.
+    def setJournaling(self, enabled=True):
+        if enabled and ("undoJournal" not in self.__dict__):
+            self.undoJournal = StepJournal(self)
+            self.step = self.undoJournal.step
+        elif not enabled:
+            self.__dict__.pop("undoJournal", None)
+            self.__dict__.pop("step", None)
+
+    # Take back the last step() taken while journaling, returning the game to the state it was in before that step.
+    # Returns False if there is no step to take back.  Unlike restore(), game objects held from before the call are
+    # still the objects in the game.
+    def undo(self):
+        journal = self.__dict__.get("undoJournal")
+        return (journal is not None) and journal.undo()
+
+    # Try each of the given actions (by default, each possible action) from the current state, leaving the game in that
+    # state.  Returns (action, observation, score, gameOver, gameWon, child) for each action, where child.thaw() makes a
+    # new game in the state after the action.  Each action is taken and then undone in this game (which is checked
+    # against its fingerprint, see expandGame()), so the children share its indices and action table, and a child is
+    # only copied when it's asked for.
+    def expand(self, actions=None):
+        if actions is None:
+            actions = list(self.generatePossibleActions())
+        return expandGame(self, actions)
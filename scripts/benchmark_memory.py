@@ -0,0 +1,54 @@
+import os
+import gc
+import argparse
+import tracemalloc
+
+from glob import glob
+from os.path import join as pjoin
+
+from benchmark_steps import load_game
+
+
+def memory_per_world(TextGame, args):
+    """ Returns the mean number of bytes allocated (and kept) by a freshly initialized game """
+    # Build one game first, so that one-time allocations (imports, class-level caches) aren't counted
+    TextGame(randomSeed=args.random_seed)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = [TextGame(randomSeed=args.random_seed + i) for i in range(args.num_worlds)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del games
+    return (after - before) / args.num_worlds
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure the memory used by one initialized world of each game.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--game-folder", default="./data/refactored_programs")
+    group.add_argument("--games", nargs="+")
+    parser.add_argument("--num-worlds", type=int, default=100)
+    parser.add_argument("--random-seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    gamefiles = args.games or glob(pjoin(args.game_folder, "*.py"))
+    total = 0.0
+    print(f"{'game':40s} {'KiB/world':>10s}")
+    for gamefile in sorted(gamefiles):
+        size = memory_per_world(load_game(gamefile), args)
+        total += size
+        print(f"{os.path.basename(gamefile):40s} {size / 1024:10.1f}")
+
+    print(f"{'mean over all games':40s} {total / len(gamefiles) / 1024:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
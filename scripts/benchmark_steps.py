@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import random
+import inspect
+import argparse
+import importlib.util
+
+from glob import glob
+from os.path import join as pjoin
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+import data.library.GameBasic
+from data.library.GameEngine import ActionSpace
+
+# The library as it was before the engine was added to it
+BASELINE_LIBRARY = pjoin(ROOT, "tests", "baseline", "GameBasic.py")
+
+# The games that list their actions from the library's action space
+TEMPLATE_GAMES = [pjoin(ROOT, "tests", "games", "boil_water_templates.py")]
+
+
+def load_game(gamefile, library=None):
+    """ Load the TextGame class defined in a game file, on top of the current library or of another copy of
+        GameBasic.py (e.g. the baseline one) """
+    module_name = os.path.basename(gamefile)[:-3].replace('-', '_')
+    if library is not None:
+        spec = importlib.util.spec_from_file_location("benchmark_GameBasic", library)
+        sys.modules["data.library.GameBasic"] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules["data.library.GameBasic"])
+        module_name = "benchmark_baseline_" + module_name
+    try:
+        spec = importlib.util.spec_from_file_location(module_name, gamefile)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.modules["data.library.GameBasic"] = data.library.GameBasic
+    return next(obj for name, obj in inspect.getmembers(module, inspect.isclass)
+                if obj.__module__ == module_name and name.endswith('Game'))
+
+
+def random_walks(TextGame, args):
+    """ Play random walks that list the possible actions before each step, as the validity check and the
+        alignment crawler do. Returns the number of steps taken. """
+    num_steps = 0
+    for walk in range(args.num_walks):
+        rng = random.Random(walk)
+        try:
+            game = TextGame(randomSeed=args.random_seed)
+            possible_actions = game.generatePossibleActions()
+            for _ in range(args.max_steps):
+                game.step(rng.choice(sorted(possible_actions)))
+                num_steps += 1
+                if game.gameOver:
+                    break
+                possible_actions = game.generatePossibleActions()
+        except Exception:
+            # Some games have bugs on rarely visited paths; the walk simply ends there.
+            continue
+
+    return num_steps
+
+
+def uses_action_space(TextGame, args):
+    """ Check whether a game lists its actions from the library's action space (i.e. it registers action
+        templates), the only games that ActionSpace.incremental makes a difference to """
+    try:
+        game = TextGame(randomSeed=args.random_seed)
+        game.generatePossibleActions()
+    except Exception:
+        return False
+    return "actionSpace" in game.__dict__
+
+
+def steps_per_sec(TextGame, args):
+    """ Returns the steps/sec of random walks of a game, or None if it can't be played at all """
+    # Warm up (class-level caches, first-time imports) so that the measurement doesn't pay for it
+    if random_walks(TextGame, args) == 0:
+        return None
+    # Keep the fastest of several runs, which is the least disturbed by the rest of the system
+    best = 0.0
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        num_steps = random_walks(TextGame, args)
+        best = max(best, num_steps / (time.perf_counter() - start))
+    return best
+
+
+def benchmark(gamefile, args):
+    """ Returns the steps/sec of a game on the baseline library, on the current library with its actions listed from
+        scratch (only for games that list them from the action space, None for others), and on the current library.
+        A game that can't be played on the baseline library (e.g. one that registers action templates) has None for
+        it. """
+    try:
+        baseline = steps_per_sec(load_game(gamefile, BASELINE_LIBRARY), args)
+    except Exception:
+        baseline = None
+
+    TextGame = load_game(gamefile)
+    scratch = None
+    if uses_action_space(TextGame, args):
+        ActionSpace.incremental = False
+        try:
+            scratch = steps_per_sec(TextGame, args)
+        finally:
+            ActionSpace.incremental = True
+    return baseline, scratch, steps_per_sec(TextGame, args)
+
+
+def format_rate(rate):
+    return f"{rate:10.0f}" if rate else f"{'-':>10s}"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure how many steps per second each game runs at, on the"
+                                                 " baseline library (tests/baseline/GameBasic.py, before) and on the"
+                                                 " current one (after).  Games that register action templates are"
+                                                 " also measured with their actions listed from scratch"
+                                                 " (ActionSpace.incremental off).")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--game-folder", default="./data/refactored_programs",
+                       help="Benchmark the games in this folder, along with the template games in tests/games.")
+    group.add_argument("--games", nargs="+")
+    parser.add_argument("--num-walks", type=int, default=10)
+    parser.add_argument("--max-steps", type=int, default=50)
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    gamefiles = args.games or glob(pjoin(args.game_folder, "*.py")) + TEMPLATE_GAMES
+    totals = [0.0, 0.0]
+    num_compared = 0
+    unaffected = []     # Games that ActionSpace.incremental makes no difference to
+    print(f"{'game':40s} {'before':>10s} {'scratch':>10s} {'after':>10s} {'speedup':>8s}")
+    for gamefile in sorted(gamefiles, key=os.path.basename):
+        before, scratch, after = benchmark(gamefile, args)
+        if scratch is None:
+            unaffected.append(os.path.basename(gamefile))
+        speedup = f"{after / before:7.2f}x" if (before and after) else f"{'-':>8s}"
+        print(f"{os.path.basename(gamefile):40s} {format_rate(before)} {format_rate(scratch)} {format_rate(after)} {speedup}")
+        if before and after:
+            totals[0] += 1 / before
+            totals[1] += 1 / after
+            num_compared += 1
+
+    # Harmonic mean, i.e. the rate when running an equal number of steps in every game (that runs on both libraries)
+    if num_compared:
+        before, after = num_compared / totals[0], num_compared / totals[1]
+        print(f"{'all games (steps/sec)':40s} {before:10.0f} {'':10s} {after:10.0f} {after / before:7.2f}x")
+    if unaffected:
+        print(f"\nActionSpace.incremental makes no difference to {len(unaffected)} of {len(gamefiles)} games, which"
+              f" don't register action templates (no 'scratch' column): {', '.join(unaffected)}")
+
+
+if __name__ == "__main__":
+    main()
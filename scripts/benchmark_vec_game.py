@@ -0,0 +1,57 @@
+import os
+import sys
+import random
+import argparse
+
+from glob import glob
+from os.path import join as pjoin
+
+from benchmark_steps import load_game
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from bytes32.vec_game import VecTextGame
+
+
+def run_random_agents(envs, args):
+    """ Play a random agent in every environment for a number of batched steps """
+    rng = random.Random(args.random_seed)
+    envs.reset_all()
+    for _ in range(args.num_steps):
+        actions = [rng.choice(list(possible_actions)) for possible_actions in envs.get_possible_actions()]
+        envs.step_batch(actions)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run random agents in a batch of games (cycling through the given"
+                                                 " games, each with its own seed), and report the aggregate"
+                                                 " throughput.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--game-folder", default="./data/refactored_programs")
+    group.add_argument("--games", nargs="+")
+    parser.add_argument("--num-envs", type=int, default=256)
+    parser.add_argument("--num-steps", type=int, default=100,
+                        help="Number of batched steps (each takes one step in every environment).")
+    parser.add_argument("--random-seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    gamefiles = sorted(args.games or glob(pjoin(args.game_folder, "*.py")))
+    games = [load_game(gamefile) for gamefile in gamefiles]
+    envs = VecTextGame([games[idx % len(games)] for idx in range(args.num_envs)],
+                       seeds=[args.random_seed + idx for idx in range(args.num_envs)])
+    run_random_agents(envs, args)
+
+    throughput = envs.get_throughput()
+    print(f"{'environments':20s} {throughput['num_envs']:10d}")
+    print(f"{'steps':20s} {throughput['steps']:10d}")
+    print(f"{'finished games':20s} {throughput['episodes']:10d}")
+    print(f"{'games with errors':20s} {throughput['errors']:10d}")
+    print(f"{'seconds':20s} {throughput['seconds']:10.2f}")
+    print(f"{'steps/sec':20s} {throughput['steps_per_sec']:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
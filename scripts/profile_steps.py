@@ -0,0 +1,68 @@
+import os
+import argparse
+import cProfile
+import pstats
+
+from glob import glob
+from os.path import join as pjoin
+
+from benchmark_steps import load_game, random_walks
+
+
+TRAVERSAL_FUNCTIONS = ["getAllContainedObjectsRecursive", "iterContainedObjectsRecursive",
+                       "getContainedObjects", "iterContainedObjects", "rebuild"]
+
+
+def profile(games, args):
+    """ Profile random walks through each game. Returns the profile and the number of steps taken. """
+    # Warm up (class-level caches, first-time imports) so that the profile doesn't include them
+    for TextGame in games:
+        random_walks(TextGame, args)
+
+    num_steps = 0
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for TextGame in games:
+        num_steps += random_walks(TextGame, args)
+    profiler.disable()
+
+    return pstats.Stats(profiler), num_steps
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Profile random walks through the games, and report the calls to (and"
+                                                 " the time spent in) some functions per step().")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--game-folder", default="./data/refactored_programs")
+    group.add_argument("--games", nargs="+")
+    parser.add_argument("--functions", nargs="+", default=TRAVERSAL_FUNCTIONS,
+                        help="Names of the functions to report. Default: the object tree traversal functions.")
+    parser.add_argument("--num-walks", type=int, default=10)
+    parser.add_argument("--max-steps", type=int, default=50)
+    parser.add_argument("--random-seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    gamefiles = args.games or glob(pjoin(args.game_folder, "*.py"))
+    stats, num_steps = profile([load_game(gamefile) for gamefile in sorted(gamefiles)], args)
+
+    # Time is the time spent in the function itself (not in the functions it calls), so that recursive and nested
+    # calls aren't counted twice
+    total_calls, total_time = 0, 0.0
+    print(f"{'function':60s} {'calls/step':>10s} {'us/step':>8s}")
+    for (filename, lineno, name), (_, num_calls, own_time, _, _) in sorted(stats.stats.items()):
+        if name in args.functions:
+            total_calls += num_calls
+            total_time += own_time
+            location = f"{os.path.basename(filename)}:{lineno}({name})"
+            print(f"{location:60s} {num_calls / num_steps:10.1f} {own_time / num_steps * 1e6:8.2f}")
+
+    print(f"{'total':60s} {total_calls / num_steps:10.1f} {total_time / num_steps * 1e6:8.2f}")
+    print(f"{'(all functions)':60s} {'':10s} {stats.total_tt / num_steps * 1e6:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import time
 import argparse
 import traceback
 
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from glob import glob
 from os.path import join as pjoin
 
@@ -13,10 +14,12 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from bytes32 import check_winnability
+from bytes32 import check_winnability_by_search
 from bytes32 import check_compliance
 from bytes32 import check_alignment
 from bytes32 import check_validity
 from bytes32.utils import get_empty_metrics
+from bytes32.winnability.solver import STATUS_WINNABLE, STATUS_UNWINNABLE, STRATEGIES
 
 
 def automatic_evaluation(gamefile, args, metrics=None):
@@ -43,8 +46,24 @@ def automatic_evaluation(gamefile, args, metrics=None):
     if not args.skip_check_winnability:
         try:
             print(colored("Running winnability check...", "yellow"))
-            metrics["winnability"] = check_winnability(gamefile, args.agent_model_name, args.game_random_seed,
-                                                       args.env_step_limit)
+            winnability = None
+            if args.winnability_solver:
+                # The search looks for wins within as many actions as the agent may take
+                winnability = check_winnability_by_search(gamefile, args.game_random_seed, args.solver_strategy,
+                                                          args.solver_max_nodes, args.solver_time_limit,
+                                                          max_depth=args.env_step_limit,
+                                                          memory_limit_mb=args.solver_memory_limit)
+                print(f"-> Search: {winnability['solver']['status']}")
+
+            # The agent is only run when the search didn't settle whether the game can be won
+            if (winnability is None) or (winnability["solver"]["status"] not in (STATUS_WINNABLE, STATUS_UNWINNABLE)):
+                solver = winnability["solver"] if winnability else None
+                winnability = check_winnability(gamefile, args.agent_model_name, args.game_random_seed,
+                                                args.env_step_limit, time_limit=args.winnability_timeout,
+                                                memory_limit_mb=args.winnability_memory_limit)
+                if solver:
+                    winnability["solver"] = solver
+            metrics["winnability"] = winnability
         except Exception as e:
             stacktrace = [frame.replace(os.getcwd(), "").strip() for frame in traceback.format_tb(e.__traceback__) if
                           gamefile in frame or "language_agent.py" in frame]
@@ -62,6 +81,9 @@ def parse_args():
     parser.add_argument("--data", type=str, default="./data/")
 
     parser.add_argument("--results-file", type=str, default="eval_results.json")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of games evaluated at once, each in its own process (the results are the same as"
+                             " evaluating them one at a time).")
 
     parser.add_argument("--skip-check-alignment", action="store_true")
     parser.add_argument("--skip-check-compliance", action="store_true")
@@ -73,6 +95,21 @@ def parse_args():
     validity_group.add_argument("--max-steps", type=int, default=3)
     validity_group.add_argument("--random-seed", type=int, default=0)
     validity_group.add_argument("--max-num-actions", type=int, default=100)
+    validity_group.add_argument("--max-snapshots", type=int, default=1000,
+                                help="Most game states kept at once to branch the search from (past that, action"
+                                     " sequences are replayed from the start, as they always are for games whose"
+                                     " state holds closures).")
+    validity_group.add_argument("--validity-timeout", type=int, default=15 * 60,
+                                help="Seconds the checks of a game may take (past that, the game is killed and reported"
+                                     " as timing out).")
+    validity_group.add_argument("--validity-memory-limit", type=int, default=4096,
+                                help="Megabytes of memory the checks of a game may use (past that, the game is reported"
+                                     " as running out of memory).")
+    validity_group.add_argument("--prune-visited-states", action="store_true",
+                                help="Don't search again from states already reached with as few actions.")
+    validity_group.add_argument("--skip-no-op-actions", action="store_true",
+                                help="Don't take actions again once they were seen to leave the state unchanged (e.g."
+                                     " look, inventory), which may miss errors they raise elsewhere.")
 
     compliance_group = parser.add_argument_group("Specification Compliance")
     compliance_group.add_argument("--compliance-model-name", default="gpt-4o-mini")
@@ -84,16 +121,42 @@ def parse_args():
     alignment_group.add_argument("--alignment-model-name", default="gpt-4o-mini")
     alignment_group.add_argument("--shuffle-random-seed", type=int, default=0)
     alignment_group.add_argument("--max-depth", type=int, default=2)
+    alignment_group.add_argument("--skip-transpositions", action="store_true",
+                                 help="Don't crawl below states already reached by a different order of actions.")
     alignment_group.add_argument("--max-paths", type=int, default=25000)
     alignment_group.add_argument("--error-strategy", type=str, default="fail")
     alignment_group.add_argument("--num-samples-per-game", type=int, default=100)
     alignment_group.add_argument("--sample-strategy", type=str, default="action_even")
     alignment_group.add_argument("--alignment-batch-size", type=int, default=1)
+    alignment_group.add_argument("--alignment-timeout", type=int, default=60 * 60,
+                                 help="Seconds the alignment check of a game may take (past that, the game is killed"
+                                      " and reported as timing out).")
+    alignment_group.add_argument("--alignment-memory-limit", type=int, default=4096,
+                                 help="Megabytes of memory the alignment check of a game may use (past that, the game"
+                                      " is reported as running out of memory).")
 
     winnability_group = parser.add_argument_group("Winnability")
     winnability_group.add_argument("--agent-model-name", default="gpt-4o-mini")
     winnability_group.add_argument("--env-step-limit", type=int, default=50)
     winnability_group.add_argument("--game-random-seed", type=int, default=20230614)
+    winnability_group.add_argument("--winnability-timeout", type=int, default=60 * 60,
+                                   help="Seconds the agent may take to play a game (past that, the game is killed and"
+                                        " reported as timing out).")
+    winnability_group.add_argument("--winnability-memory-limit", type=int, default=4096,
+                                   help="Megabytes of memory the game played by the agent may use (past that, the game"
+                                        " is reported as running out of memory).")
+    winnability_group.add_argument("--winnability-solver", action="store_true",
+                                   help="Search the game's states for a win (within --env-step-limit actions) first,"
+                                        " and only run the agent when the search can't tell whether the game can be"
+                                        " won.")
+    winnability_group.add_argument("--solver-strategy", default="bfs", choices=STRATEGIES)
+    winnability_group.add_argument("--solver-max-nodes", type=int, default=10000,
+                                   help="Most states the search expands.")
+    winnability_group.add_argument("--solver-time-limit", type=int, default=300,
+                                   help="Seconds the search may take.")
+    winnability_group.add_argument("--solver-memory-limit", type=int, default=4096,
+                                   help="Megabytes of memory the search may use (past that, the search is stopped, and"
+                                        " the agent plays the game instead).")
 
     args = parser.parse_args()
     return args
@@ -109,8 +172,12 @@ def main():
         with open(args.results_file) as f:
             results = json.load(f)
 
-    gamefiles = args.games or glob(pjoin(args.game_folder, "*.py"))
-    pbar = tqdm(sorted(gamefiles))
+    gamefiles = sorted(args.games or glob(pjoin(args.game_folder, "*.py")))
+    if args.workers > 1:
+        evaluate_in_parallel(gamefiles, results, args)
+        return
+
+    pbar = tqdm(gamefiles)
     for gamefile in pbar:
         time.sleep(0.1)
         pbar.set_description(os.path.basename(gamefile))
@@ -118,18 +185,72 @@ def main():
         if os.path.basename(gamefile) in results:
             continue
 
-        existing_metrics = results.get(os.path.basename(gamefile), {}).get("metrics")
-        existing_reflection_prompt = results.get(os.path.basename(gamefile), {}).get("reflection_prompt", "")
-        existing_reflection_response = results.get(os.path.basename(gamefile), {}).get("reflection_response", "")
-        new_metrics = automatic_evaluation(gamefile, args, metrics=existing_metrics)
-        results[os.path.basename(gamefile)] = {
-            "metrics": new_metrics,
-            "reflection_prompt": existing_reflection_prompt,
-            "reflection_response": existing_reflection_response
-        }
-
-        with open(args.results_file, 'w') as f:
-            json.dump(results, f, indent=2)
+        new_metrics = automatic_evaluation(gamefile, args, metrics=get_existing_metrics(results, gamefile))
+        add_result(results, gamefile, new_metrics)
+        save_results(results, args.results_file)
+
+
+def get_existing_metrics(results, gamefile):
+    """ The metrics of a game already in the results (if any) """
+    return results.get(os.path.basename(gamefile), {}).get("metrics")
+
+
+def add_result(results, gamefile, new_metrics):
+    """ Add the metrics of a game to the results (keeping its reflection, if any) """
+    existing_reflection_prompt = results.get(os.path.basename(gamefile), {}).get("reflection_prompt", "")
+    existing_reflection_response = results.get(os.path.basename(gamefile), {}).get("reflection_response", "")
+    results[os.path.basename(gamefile)] = {
+        "metrics": new_metrics,
+        "reflection_prompt": existing_reflection_prompt,
+        "reflection_response": existing_reflection_response
+    }
+
+
+def save_results(results, results_file):
+    with open(results_file, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def evaluate_in_parallel(gamefiles, results, args):
+    """ Evaluate games `args.workers` at a time, each in a new process of its own (so that games don't share any
+        state). The results are merged as games complete, in the order they would have been added one at a time (by
+        sorted game file), so that the results file ends up the same as with a single worker. """
+    gamefiles = [gamefile for gamefile in gamefiles if os.path.basename(gamefile) not in results]
+    new_metrics = {}
+    pending = list(gamefiles)
+    running = {}    # future -> (its executor, gamefile)
+    pbar = tqdm(total=len(gamefiles))
+    try:
+        while pending or running:
+            # A single-worker executor per game (rather than one pool) is the new process for each game
+            while pending and len(running) < args.workers:
+                gamefile = pending.pop(0)
+                executor = ProcessPoolExecutor(max_workers=1)
+                future = executor.submit(automatic_evaluation, gamefile, args, get_existing_metrics(results, gamefile))
+                running[future] = (executor, gamefile)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                executor, gamefile = running.pop(future)
+                executor.shutdown()
+                pbar.set_description(os.path.basename(gamefile))
+                pbar.update(1)
+                new_metrics[gamefile] = future.result()
+
+            merged = dict(results)
+            for evaluated_gamefile in gamefiles:
+                if evaluated_gamefile in new_metrics:
+                    add_result(merged, evaluated_gamefile, new_metrics[evaluated_gamefile])
+            save_results(merged, args.results_file)
+    finally:
+        # Stop the games still running (when another one raised), without waiting for them to finish.  An executor has
+        # no way to stop a running task, so its worker process is terminated.
+        for executor, _ in running.values():
+            processes = list((executor._processes or {}).values())
+            executor.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
+        pbar.close()
 
 
 if __name__ == "__main__":
@@ -69,7 +69,9 @@ def automatic_evaluation(gamefile, args):
     if args.reflect_winnability:
         try:
             print(colored("Running winnability check...", "yellow"))
-            metrics["winnability"] = check_winnability(gamefile, args.agent_model_name, args.game_random_seed, args.env_step_limit)
+            metrics["winnability"] = check_winnability(gamefile, args.agent_model_name, args.game_random_seed, args.env_step_limit,
+                                                       time_limit=args.winnability_timeout,
+                                                       memory_limit_mb=args.winnability_memory_limit)
         except Exception as e:
             stacktrace = [frame.replace(os.getcwd(), "").strip() for frame in traceback.format_tb(e.__traceback__) if gamefile in frame or "language_agent.py" in frame]
             metrics["validity"]["error_msg"] = "\n".join(stacktrace) + "\n" + str(e)
@@ -254,6 +256,21 @@ def parse_args():
     validity_group.add_argument("--max-steps", type=int, default=3)
     validity_group.add_argument("--random-seed", type=int, default=0)
     validity_group.add_argument("--max-num-actions", type=int, default=100)
+    validity_group.add_argument("--max-snapshots", type=int, default=1000,
+                                help="Most game states kept at once to branch the search from (past that, action"
+                                     " sequences are replayed from the start, as they always are for games whose"
+                                     " state holds closures).")
+    validity_group.add_argument("--validity-timeout", type=int, default=15 * 60,
+                                help="Seconds the checks of a game may take (past that, the game is killed and reported"
+                                     " as timing out).")
+    validity_group.add_argument("--validity-memory-limit", type=int, default=4096,
+                                help="Megabytes of memory the checks of a game may use (past that, the game is reported"
+                                     " as running out of memory).")
+    validity_group.add_argument("--prune-visited-states", action="store_true",
+                                help="Don't search again from states already reached with as few actions.")
+    validity_group.add_argument("--skip-no-op-actions", action="store_true",
+                                help="Don't take actions again once they were seen to leave the state unchanged (e.g."
+                                     " look, inventory), which may miss errors they raise elsewhere.")
 
     compliance_group = parser.add_argument_group("Specification Compliance")
     compliance_group.add_argument("--compliance-model-name", default="gpt-4o-mini")
@@ -265,16 +282,30 @@ def parse_args():
     alignment_group.add_argument("--alignment-model-name", default="gpt-4o-mini")
     alignment_group.add_argument("--shuffle-random-seed", type=int, default=0)
     alignment_group.add_argument("--max-depth", type=int, default=2)
+    alignment_group.add_argument("--skip-transpositions", action="store_true",
+                                 help="Don't crawl below states already reached by a different order of actions.")
     alignment_group.add_argument("--max-paths", type=int, default=25000)
     alignment_group.add_argument("--error-strategy", type=str, default="fail")
     alignment_group.add_argument("--num-samples-per-game", type=int, default=100)
     alignment_group.add_argument("--sample-strategy", type=str, default="action_even")
     alignment_group.add_argument("--alignment-batch-size", type=int, default=1)
+    alignment_group.add_argument("--alignment-timeout", type=int, default=60 * 60,
+                                 help="Seconds the alignment check of a game may take (past that, the game is killed"
+                                      " and reported as timing out).")
+    alignment_group.add_argument("--alignment-memory-limit", type=int, default=4096,
+                                 help="Megabytes of memory the alignment check of a game may use (past that, the game"
+                                      " is reported as running out of memory).")
 
     winnability_group = parser.add_argument_group("Game Winnability")
     winnability_group.add_argument("--agent-model-name", default="gpt-4o-mini")
     winnability_group.add_argument("--env-step-limit", type=int, default=30)
     winnability_group.add_argument("--game-random-seed", type=int, default=20230614)
+    winnability_group.add_argument("--winnability-timeout", type=int, default=60 * 60,
+                                   help="Seconds the agent may take to play a game (past that, the game is killed and"
+                                        " reported as timing out).")
+    winnability_group.add_argument("--winnability-memory-limit", type=int, default=4096,
+                                   help="Megabytes of memory the game played by the agent may use (past that, the game"
+                                        " is reported as running out of memory).")
 
     args = parser.parse_args()
     return args
@@ -0,0 +1,34 @@
+# A combination lock, small enough for the winnability search to explore every state: the dial is turned one number
+# at a time, and opening the lock wins if the dial shows the combination (and loses otherwise).
+
+from data.library.GameBasic import *
+
+
+class CombinationLockGame(TextGame):
+    # The combination, or None for a lock that is jammed (and can't be opened)
+    combination = 2
+
+    def initializeWorld(self):
+        self.dial = 0
+        return World("vault")
+
+    def getTaskDescription(self):
+        return "Your task is to open the lock."
+
+    def generatePossibleActions(self):
+        self.possibleActions = {"turn dial": [["turn dial"]], "open lock": [["open lock"]]}
+        return self.possibleActions
+
+    def step(self, actionStr):
+        self.numSteps += 1
+        if actionStr == "turn dial":
+            self.dial = (self.dial + 1) % 4
+            self.observationStr = f"The dial shows {self.dial}."
+        elif actionStr == "open lock":
+            self.gameOver = True
+            self.gameWon = (self.dial == self.combination)
+            self.score = 1 if self.gameWon else 0
+            self.observationStr = "The lock opens." if self.gameWon else "The lock doesn't open, and jams."
+        else:
+            self.observationStr = "I don't understand that."
+        return (self.observationStr, self.score, 0, self.gameOver, self.gameWon)
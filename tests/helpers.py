@@ -0,0 +1,56 @@
+import os
+import sys
+import random
+import inspect
+import importlib
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAMES_FOLDER = os.path.join(ROOT, "tests", "games")
+REFACTORED_PROGRAMS_FOLDER = os.path.join(ROOT, "data", "refactored_programs")
+
+
+def load_game_class(gamefile, module_name=None):
+    """ Import a game file (as a module of its own, even if its name isn't a valid module name), and return its
+        TextGame class """
+    module_name = module_name or "game_" + os.path.basename(gamefile)[:-3].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(module_name, gamefile)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return next(obj for name, obj in inspect.getmembers(module, inspect.isclass)
+                if obj.__module__ == module_name and name.endswith("Game"))
+
+
+def import_bytes32_module(module_name):
+    """ Import a module of the bytes32 package (e.g. "bytes32.sandbox") without running bytes32/__init__.py, which
+        imports every check, along with the LLM clients that they need """
+    if "bytes32" not in sys.modules:
+        package_folder = os.path.join(ROOT, "bytes32")
+        spec = importlib.util.spec_from_file_location("bytes32", os.path.join(package_folder, "__init__.py"),
+                                                      submodule_search_locations=[package_folder])
+        sys.modules["bytes32"] = importlib.util.module_from_spec(spec)
+    return importlib.import_module(module_name)
+
+
+def play_random_walk(game, num_steps, walk_seed):
+    """ Play a random walk that lists the possible actions before every step (as the evaluation does). Returns the
+        trace of the walk: the initial observation and score, then the sorted possible actions and the result of
+        each step (or the exception a step raised, which ends the walk). """
+    rng = random.Random(walk_seed)
+    trace = [game.observationStr, game.score]
+    for _ in range(num_steps):
+        try:
+            actions = sorted(game.generatePossibleActions().keys())
+        except Exception as e:
+            trace.append(("exception", type(e).__name__, str(e)))
+            break
+        trace.append(actions)
+        action = rng.choice(actions)
+        try:
+            trace.append((action,) + tuple(game.step(action)))
+        except Exception as e:
+            trace.append((action, "exception", type(e).__name__, str(e)))
+            break
+        if game.gameOver:
+            break
+    return trace
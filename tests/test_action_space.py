@@ -0,0 +1,29 @@
+import os
+
+from helpers import GAMES_FOLDER, REFACTORED_PROGRAMS_FOLDER, load_game_class, play_random_walk
+
+BoilWaterGame = load_game_class(os.path.join(REFACTORED_PROGRAMS_FOLDER, "boil-water.py"))
+BoilWaterTemplatesGame = load_game_class(os.path.join(GAMES_FOLDER, "boil_water_templates.py"))
+
+SOLUTION = ["take pot", "put pot in sink", "turn on sink", "turn off sink", "take pot", "put pot on stove",
+            "turn on stove"] + ["look around"] * 10
+
+
+def test_templates_list_and_accept_the_same_actions():
+    for random_seed in (0, 1, 2):
+        for walk_seed in range(5):
+            expected = play_random_walk(BoilWaterGame(randomSeed=random_seed), 40, walk_seed)
+            assert play_random_walk(BoilWaterTemplatesGame(randomSeed=random_seed), 40, walk_seed) == expected
+
+
+def test_templates_win_the_same_way():
+    games = [BoilWaterGame(randomSeed=0), BoilWaterTemplatesGame(randomSeed=0)]
+    for action in SOLUTION:
+        results = []
+        for game in games:
+            game.generatePossibleActions()
+            results.append(game.step(action))
+        assert results[0] == results[1]
+        if games[0].gameOver:
+            break
+    assert games[0].gameWon and games[1].gameWon
@@ -0,0 +1,68 @@
+from data.library.GameBasic import GameObject, World, TextGame
+
+
+# A candle that burns down over a few ticks, and then sleeps (nothing changes it again)
+class Candle(GameObject):
+    def __init__(self):
+        GameObject.__init__(self, "candle")
+        self.properties["wax"] = 3
+        self.ticks = 0
+
+    def tick(self):
+        self.ticks += 1
+        if self.properties["wax"] > 0:
+            self.properties["wax"] -= 1
+        else:
+            self.sleep()
+
+
+class CandleGame(TextGame):
+    def initializeWorld(self):
+        world = World("chapel")
+        self.candle = Candle()
+        world.addObject(self.candle)
+        return world
+
+
+# A game that ends after a few steps, whether or not anything in its world changes
+class VigilGame(CandleGame):
+    def calculateScore(self):
+        if self.numSteps >= 5:
+            self.gameOver = True
+
+
+# A game that does more than tick its objects on each tick
+class TallyGame(CandleGame):
+    def doWorldTick(self):
+        self.tally = getattr(self, "tally", 0) + 1
+        CandleGame.doWorldTick(self)
+
+
+class EmptyGame(TextGame):
+    def initializeWorld(self):
+        return World("void")
+
+
+def test_advance_passes_the_ticks_after_the_world_falls_asleep_at_once():
+    game = CandleGame(randomSeed=0)
+    assert game.advance(10) == 10
+    assert game.numSteps == 10
+    assert game.candle.properties["wax"] == 0
+    # (Once the candle is out and asleep, the rest of the ticks are skipped)
+    assert game.candle.ticks == 4
+
+
+def test_advance_runs_every_tick_of_games_that_do_more_than_tick_their_objects():
+    game = VigilGame(randomSeed=0)
+    assert game.advance(10) == 5
+    assert (game.numSteps, game.gameOver) == (5, True)
+
+    game = TallyGame(randomSeed=0)
+    assert game.advance(10) == 10
+    assert (game.numSteps, game.tally) == (10, 10)
+
+
+def test_world_where_nothing_ticks_is_not_asleep():
+    game = EmptyGame(randomSeed=0)
+    assert not game.isWorldAsleep()
+    assert CandleGame(randomSeed=0).isWorldAsleep() is False
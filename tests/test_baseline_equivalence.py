@@ -0,0 +1,43 @@
+import os
+import sys
+import importlib.util
+
+import pytest
+
+import data.library.GameBasic
+
+from helpers import ROOT, REFACTORED_PROGRAMS_FOLDER, load_game_class, play_random_walk
+
+# The library as it was before the engine was added to it, to check that the games still play the same on top of it
+BASELINE_LIBRARY = os.path.join(ROOT, "tests", "baseline", "GameBasic.py")
+
+# In make-ice-cubes.py, things can no longer be put in the ice cube tray while it's in the closed freezer (take and put
+# now check that the container can be reached), so its walks differ on purpose
+CHANGED_GAMEFILES = ["make-ice-cubes.py"]
+
+GAMEFILES = sorted(filename for filename in os.listdir(REFACTORED_PROGRAMS_FOLDER)
+                   if filename.endswith(".py") and filename not in CHANGED_GAMEFILES)
+
+
+def load_baseline_game_class(gamefile):
+    """ Import a game file on top of the baseline library, rather than the current one """
+    spec = importlib.util.spec_from_file_location("baseline_GameBasic", BASELINE_LIBRARY)
+    library = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(library)
+
+    sys.modules["data.library.GameBasic"] = library
+    try:
+        return load_game_class(gamefile, "baseline_game_" + os.path.basename(gamefile)[:-3].replace("-", "_"))
+    finally:
+        sys.modules["data.library.GameBasic"] = data.library.GameBasic
+
+
+@pytest.mark.parametrize("filename", GAMEFILES)
+def test_games_play_as_on_the_baseline_library(filename):
+    gamefile = os.path.join(REFACTORED_PROGRAMS_FOLDER, filename)
+    baseline_class = load_baseline_game_class(gamefile)
+    game_class = load_game_class(gamefile)
+    for random_seed in (0, 1):
+        for walk_seed in (0, 1, 2):
+            expected = play_random_walk(baseline_class(randomSeed=random_seed), 40, walk_seed)
+            assert play_random_walk(game_class(randomSeed=random_seed), 40, walk_seed) == expected
@@ -0,0 +1,104 @@
+import os
+import random
+
+import pytest
+
+from data.library.GameBasic import World, TextGame
+from data.library.GameEngine import StepJournal
+from helpers import REFACTORED_PROGRAMS_FOLDER, load_game_class
+from test_undo import DiaryGame
+
+GAMEFILES = sorted(filename for filename in os.listdir(REFACTORED_PROGRAMS_FOLDER) if filename.endswith(".py"))
+
+
+def check_expand_leaves_the_parent_unchanged(game):
+    """ Expand the possible actions of a game, checking that the game is left unchanged. Some games have actions that
+        raise an exception (which expand() passes on, once the action is taken back): the first of those is expanded
+        on its own, and the others are left out. Returns the children. """
+    fingerprint = game.stateFingerprint()
+    observation, num_steps = game.observationStr, game.numSteps
+
+    actions, failing_actions = [], []
+    game.setJournaling(True)
+    for action in list(game.generatePossibleActions()):
+        try:
+            game.step(action)
+            actions.append(action)
+        except Exception:
+            failing_actions.append(action)
+        finally:
+            game.undo()
+    game.setJournaling(False)
+
+    if failing_actions:
+        with pytest.raises(Exception):
+            game.expand(failing_actions[:1])
+        assert game.stateFingerprint() == fingerprint
+    children = game.expand(actions)
+    assert game.stateFingerprint() == fingerprint
+    assert (game.observationStr, game.numSteps) == (observation, num_steps)
+    return children
+
+
+@pytest.mark.parametrize("gamefile", GAMEFILES)
+def test_expand_leaves_the_parent_unchanged(gamefile):
+    game = load_game_class(os.path.join(REFACTORED_PROGRAMS_FOLDER, gamefile))(randomSeed=0)
+    rng = random.Random(0)
+    for _ in range(5):
+        children = check_expand_leaves_the_parent_unchanged(game)
+        action, _, score, game_over, _, child = rng.choice(children)
+        # A child is the state the action leads to
+        child_game = child.thaw()
+        game.generatePossibleActions()
+        game.step(action)
+        assert child_game.stateFingerprint() == game.stateFingerprint()
+        if game_over:
+            break
+
+
+def test_expand_leaves_game_containers_unchanged():
+    game = DiaryGame(randomSeed=0)
+    game.step("write")
+    check_expand_leaves_the_parent_unchanged(game)
+    assert game.log == ["write"] and game.diary.properties["pages"] == [["first page", "more"]]
+
+
+# A game whose state is held by a plain helper object, outside of any game object: checking wins once it's pressed
+class Switch():
+    def __init__(self):
+        self.pressed = False
+
+
+class SwitchGame(TextGame):
+    def initializeWorld(self):
+        self.switch = Switch()
+        return World("hall")
+
+    def generatePossibleActions(self):
+        self.possibleActions = {"press": [["press"]], "check": [["check"]]}
+        return self.possibleActions
+
+    def step(self, actionStr):
+        if actionStr == "press":
+            self.switch.pressed = True
+            self.observationStr = "pressed"
+        else:
+            self.observationStr = "checked" if self.switch.pressed else "not pressed"
+            self.gameOver = self.gameWon = self.switch.pressed
+        self.numSteps += 1
+        return (self.observationStr, self.score, 0, self.gameOver, self.gameWon)
+
+
+@pytest.mark.parametrize("journal_helpers", [True, False])
+def test_expand_leaves_helper_objects_unchanged(journal_helpers, monkeypatch):
+    if not journal_helpers:
+        # (A change the journal misses is caught by the fingerprint, and the game is thawed back instead)
+        monkeypatch.setattr(StepJournal, "recordValue", lambda journal, value: None)
+    game = SwitchGame(randomSeed=0)
+    fingerprint = game.stateFingerprint()
+    children = game.expand()
+    assert game.stateFingerprint() == fingerprint
+    assert [child[:5] for child in children] == [("press", "pressed", 0, False, False),
+                                                 ("check", "not pressed", 0, False, False)]
+    assert not game.switch.pressed
+    assert children[1][5].thaw().observationStr == "not pressed"
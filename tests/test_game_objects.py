@@ -0,0 +1,123 @@
+from data.library.GameBasic import GameObject, Container, World, TextGame
+from data.library.GameEngine import PropertyStore
+
+
+# A cup whose referents depend on a property
+class Cup(GameObject):
+    def __init__(self):
+        GameObject.__init__(self, "cup")
+        self.properties["isDirty"] = False
+
+    def getReferents(self):
+        return ["dirty cup"] if self.getProperty("isDirty") else ["cup"]
+
+
+def make_world(*objs):
+    world = World("kitchen")
+    for obj in objs:
+        world.addObject(obj)
+    # (The world's indices are made on first use)
+    world.getReferentIndex()
+    return world
+
+
+def test_assigned_properties_are_a_property_store():
+    cup = Cup()
+    world = make_world(cup)
+
+    cup.properties = {"isDirty": True, "color": "blue"}
+    assert type(cup.properties) is PropertyStore
+    assert cup.getProperty("isDirty") and cup.getProperty("color") == "blue"
+    assert cup.getProperty("isContainer") is None
+    # The referents that depend on the new properties are indexed again
+    assert world.getObjectsByReferent("dirty cup") == [cup]
+    assert not world.getObjectsByReferent("cup")
+
+
+def test_properties_assigned_from_another_object_are_copied():
+    cup, box = Cup(), Container("box")
+    make_world(cup, box)
+
+    cup.properties = box.properties
+    assert cup.properties is not box.properties
+    assert cup.getProperty("isContainer")
+    cup.properties["isContainer"] = False
+    assert box.getProperty("isContainer")
+
+
+def test_assigned_contents_are_indexed():
+    box, apple, pear = Container("box"), GameObject("apple"), GameObject("pear")
+    box.addObject(apple)
+    world = make_world(box)
+    assert world.getObjectsByReferent("apple") == [apple]
+
+    box.contains = [pear]
+    pear.parentContainer = box
+    assert world.getObjectsByReferent("pear") == [pear]
+    assert not world.getObjectsByReferent("apple")
+    assert world.getAllContainedObjectsRecursive() == [box, pear]
+
+    # The new contents keep reporting changes
+    plum = GameObject("plum")
+    box.addObject(plum)
+    assert world.getObjectsByReferent("plum") == [plum]
+    assert world.getAllContainedObjectsRecursive() == [box, pear, plum]
+
+
+# A baby that falls asleep and wakes up on its own, keeping track of it in an attribute of its own
+class Baby(GameObject):
+    def __init__(self):
+        GameObject.__init__(self, "baby")
+        self.isAsleep = False
+        self.ticks = 0
+
+    def tick(self):
+        self.ticks += 1
+        self.isAsleep = not self.isAsleep
+
+
+class NurseryGame(TextGame):
+    def initializeWorld(self):
+        world = World("nursery")
+        world.addObject(Baby())
+        return world
+
+
+def test_objects_can_have_their_own_asleep_attribute():
+    game = NurseryGame(randomSeed=0)
+    baby = game.rootObject.contains[0]
+    for _ in range(3):
+        game.doWorldTick()
+    assert baby.ticks == 3
+    assert baby.isAsleep
+
+
+# An apple whose referents depend on a plain attribute, rather than a property
+class Apple(GameObject):
+    def __init__(self):
+        GameObject.__init__(self, "apple")
+        self.age = 0
+
+    def tick(self):
+        self.age += 1
+
+    def getReferents(self):
+        return ["ripe apple"] if self.age >= 2 else ["green apple"]
+
+
+class OrchardGame(TextGame):
+    def initializeWorld(self):
+        world = World("orchard")
+        world.addObject(Apple())
+        return world
+
+
+def test_names_follow_attributes_that_referents_depend_on():
+    game = OrchardGame(randomSeed=0)
+    apple = game.rootObject.contains[0]
+    assert list(game.makeNameToObjectDict()) == ["green apple"]
+    game.doWorldTick()
+    assert list(game.makeNameToObjectDict()) == ["green apple"]
+    game.doWorldTick()
+    assert game.makeNameToObjectDict() == {"ripe apple": [apple]}
+    assert game.rootObject.getObjectsByReferent("ripe apple") == [apple]
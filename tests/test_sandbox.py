@@ -0,0 +1,48 @@
+import time
+
+from helpers import import_bytes32_module
+
+sandbox = import_bytes32_module("bytes32.sandbox")
+
+
+def add(a, b=0):
+    return a + b
+
+
+def fail():
+    raise ValueError("broken game")
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+
+
+def allocate(num_mb):
+    return len(bytearray(num_mb * 1024 * 1024))
+
+
+def test_run_returns_the_result():
+    run = sandbox.run_in_sandbox(add, (1,), {"b": 2}, time_limit=30, memory_limit_mb=1024)
+    assert (run["status"], run["result"], run["error_msg"]) == (sandbox.STATUS_OK, 3, "")
+
+
+def test_run_reports_exceptions():
+    run = sandbox.run_in_sandbox(fail, time_limit=30)
+    assert (run["status"], run["result"]) == (sandbox.STATUS_ERROR, None)
+    assert "ValueError: broken game" in run["error_msg"]
+
+
+def test_run_times_out():
+    start = time.perf_counter()
+    run = sandbox.run_in_sandbox(sleep_for, (60,), time_limit=1)
+    assert (run["status"], run["result"]) == (sandbox.STATUS_TIMEOUT, None)
+    # (The worker is killed, rather than waited for)
+    assert time.perf_counter() - start < 30
+
+
+def test_run_runs_out_of_memory():
+    run = sandbox.run_in_sandbox(allocate, (4096,), time_limit=30, memory_limit_mb=1024)
+    assert (run["status"], run["result"]) == (sandbox.STATUS_OUT_OF_MEMORY, None)
+    # (Allocating less than the limit is fine)
+    run = sandbox.run_in_sandbox(allocate, (16,), time_limit=30, memory_limit_mb=1024)
+    assert (run["status"], run["result"]) == (sandbox.STATUS_OK, 16 * 1024 * 1024)
@@ -0,0 +1,87 @@
+from data.library.GameBasic import GameObject, World, TextGame
+
+
+# A game whose actions are closures that capture the game, and whose button holds a closure that captures the button
+class ButtonGame(TextGame):
+    def __init__(self, randomSeed):
+        self.pressed = False
+        self.handlers = {"press": lambda: self.press(), "check": lambda: self.check()}
+        TextGame.__init__(self, randomSeed)
+
+    def initializeWorld(self):
+        world = World("room")
+        button = GameObject("button")
+        button.properties["timesPressed"] = 0
+        button.onPress = lambda: button.properties.__setitem__("timesPressed", button.properties["timesPressed"] + 1)
+        world.addObject(button)
+        return world
+
+    def press(self):
+        self.pressed = True
+        self.rootObject.contains[0].onPress()
+
+    def check(self):
+        if self.pressed:
+            self.gameOver, self.gameWon = True, True
+
+    def generatePossibleActions(self):
+        self.possibleActions = {"press": [["press"]], "check": [["check"]]}
+        return self.possibleActions
+
+    def step(self, actionStr):
+        self.handlers[actionStr]()
+        self.numSteps += 1
+        return (self.observationStr, self.score, 0, self.gameOver, self.gameWon)
+
+
+def test_stepping_a_clone_leaves_the_original_unchanged():
+    game = ButtonGame(randomSeed=0)
+    fingerprint = game.stateFingerprint()
+    clone = game.clone()
+    clone.step("press")
+    clone.step("check")
+    assert clone.gameWon and clone.rootObject.contains[0].properties["timesPressed"] == 1
+    assert game.stateFingerprint() == fingerprint
+    assert not game.pressed and game.rootObject.contains[0].properties["timesPressed"] == 0
+
+
+def test_a_snapshot_can_be_restored_again():
+    game = ButtonGame(randomSeed=0)
+    fingerprint = game.stateFingerprint()
+    snapshot = game.snapshot()
+    for _ in range(2):
+        game.restore(snapshot)
+        game.step("press")
+        assert game.rootObject.contains[0].properties["timesPressed"] == 1
+    game.restore(snapshot)
+    assert game.stateFingerprint() == fingerprint
+
+
+def test_children_of_a_game_with_closures_are_independent():
+    game = ButtonGame(randomSeed=0)
+    fingerprint = game.stateFingerprint()
+    children = {action: child for action, _, _, _, _, child in game.expand()}
+    pressed = children["press"].thaw()
+    pressed.step("check")
+    assert pressed.gameWon
+    assert game.stateFingerprint() == fingerprint
+    checked = children["check"].thaw()
+    assert not checked.gameWon and not checked.pressed
+
+
+def test_reset_game_has_its_own_closures():
+    game = ButtonGame(randomSeed=0)
+    fingerprint = game.stateFingerprint()
+    game.step("press")
+    game.reset(0)
+    assert game.stateFingerprint() == fingerprint
+    game.step("press")
+    game.step("check")
+    assert game.gameWon
+
+    # Another game reset to the same seed doesn't share them
+    other = ButtonGame(randomSeed=1)
+    other.reset(0)
+    other.step("press")
+    assert game.rootObject.contains[0].properties["timesPressed"] == 1
+    assert other.rootObject.contains[0].properties["timesPressed"] == 1
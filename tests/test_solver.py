@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from helpers import GAMES_FOLDER, import_bytes32_module, load_game_class
+
+solver = import_bytes32_module("bytes32.winnability.solver")
+
+COMBINATION_LOCK = os.path.join(GAMES_FOLDER, "combination_lock.py")
+CombinationLockGame = load_game_class(COMBINATION_LOCK)
+
+
+# A lock that can't be opened: every state can be searched, and none is won
+class JammedLockGame(CombinationLockGame):
+    combination = None
+
+
+# A jammed lock whose dial counts the turns without end, so that there are always more states to search
+class OdometerLockGame(JammedLockGame):
+    def step(self, actionStr):
+        out = JammedLockGame.step(self, actionStr)
+        if actionStr == "turn dial":
+            self.turns = getattr(self, "turns", 0) + 1
+        return out
+
+
+def replay(game_class, actions, random_seed=0):
+    """ Play actions in a new game (listing the possible actions before each step), and return the game """
+    game = game_class(randomSeed=random_seed)
+    for action in actions:
+        game.generatePossibleActions()
+        game.step(action)
+    return game
+
+
+@pytest.mark.parametrize("strategy", solver.STRATEGIES)
+def test_search_finds_a_win(strategy):
+    search = solver.WinSearch(CombinationLockGame(randomSeed=0), strategy, max_nodes=100, time_limit=60)
+    status, actions = search.run()
+    assert status == solver.STATUS_WINNABLE
+    assert replay(CombinationLockGame, actions).gameWon
+    if strategy != "best-first":
+        # (A shortest win)
+        assert actions == ["turn dial", "turn dial", "open lock"]
+
+
+@pytest.mark.parametrize("strategy", solver.STRATEGIES)
+def test_search_exhausts_an_unwinnable_game(strategy):
+    search = solver.WinSearch(JammedLockGame(randomSeed=0), strategy, max_nodes=100, time_limit=60)
+    assert search.run() == (solver.STATUS_UNWINNABLE, None)
+    # (The four positions of the dial)
+    assert search.get_stats()["num_expanded"] >= 4
+
+
+@pytest.mark.parametrize("strategy", solver.STRATEGIES)
+def test_search_stops_at_its_budget(strategy):
+    search = solver.WinSearch(OdometerLockGame(randomSeed=0), strategy, max_nodes=10, time_limit=60)
+    assert search.run() == (solver.STATUS_UNKNOWN, None)
+    assert search.get_stats()["num_expanded"] == 10
+
+    search = solver.WinSearch(JammedLockGame(randomSeed=0), strategy, max_nodes=100, time_limit=0)
+    assert search.run() == (solver.STATUS_UNKNOWN, None)
+    assert search.get_stats()["num_expanded"] == 0
+
+
+def test_search_with_a_depth_limit_is_not_conclusive():
+    search = solver.WinSearch(JammedLockGame(randomSeed=0), "bfs", max_nodes=100, time_limit=60, max_depth=2)
+    assert search.run() == (solver.STATUS_UNKNOWN, None)
+
+
+def test_solve_game_replays_the_win():
+    result = solver.solve_game(COMBINATION_LOCK, random_seed=0, max_nodes=100, time_limit=60)
+    assert result["status"] == solver.STATUS_WINNABLE
+    assert result["actions"] == ["turn dial", "turn dial", "open lock"]
+    assert (result["score"], result["num_valid_actions"], result["error_msg"]) == (1, 2, "")
+
+
+def test_check_winnability_by_search():
+    result = solver.check_winnability_by_search(COMBINATION_LOCK, random_seed=0, max_nodes=100, time_limit=60)
+    assert (result["game_won"], result["done"], result["step"]) == (True, True, 3)
+    assert replay(CombinationLockGame, result["history"]).gameWon
+    assert result["solver"]["status"] == solver.STATUS_WINNABLE
+
+    result = solver.check_winnability_by_search(os.path.join(GAMES_FOLDER, "missing.py"), random_seed=0)
+    assert not result["game_won"]
+    assert result["solver"]["status"] == solver.STATUS_ERROR
@@ -0,0 +1,79 @@
+import os
+
+from data.library.GameBasic import World, TextGame
+
+from helpers import REFACTORED_PROGRAMS_FOLDER, load_game_class
+
+BoilWaterGame = load_game_class(os.path.join(REFACTORED_PROGRAMS_FOLDER, "boil-water.py"))
+
+
+def find_object(game, name):
+    return next(obj for obj in game.rootObject.getAllContainedObjectsRecursive() if obj.name == name)
+
+
+def test_fingerprint_after_assigning_properties():
+    game, other = BoilWaterGame(randomSeed=0), BoilWaterGame(randomSeed=0)
+    pot = find_object(game, "pot")
+
+    pot.properties = dict(pot.properties)
+    assert game.stateFingerprint() == other.stateFingerprint()
+
+    pot.properties = {**pot.properties, "temperature": 50.0, "isDented": True}
+    other_pot = find_object(other, "pot")
+    other_pot.properties["temperature"] = 50.0
+    other_pot.properties["isDented"] = True
+    assert game.stateFingerprint() == other.stateFingerprint()
+
+
+# A game where waiting changes nothing but the step count, which the game may read to end after a few steps
+class WaitingGame(TextGame):
+    def initializeWorld(self):
+        return World("waiting room")
+
+    def generatePossibleActions(self):
+        self.possibleActions = {"wait": [["wait"]]}
+        return self.possibleActions
+
+    def step(self, actionStr):
+        self.numSteps += 1
+        return (self.observationStr, self.score, 0, self.gameOver, self.gameWon)
+
+
+class HourglassGame(WaitingGame):
+    def step(self, actionStr):
+        WaitingGame.step(self, actionStr)
+        if self.numSteps >= 3:
+            self.gameOver = True
+        return (self.observationStr, self.score, 0, self.gameOver, self.gameWon)
+
+
+def test_fingerprint_has_the_step_count_of_games_that_read_it():
+    for game_class, reads_step_count in [(WaitingGame, False), (HourglassGame, True)]:
+        game = game_class(randomSeed=0)
+        fingerprints = [game.stateFingerprint()]
+        for _ in range(2):
+            game.step("wait")
+            fingerprints.append(game.stateFingerprint())
+        assert len(set(fingerprints)) == (3 if reads_step_count else 1)
+
+
+# Plain (non game object) helpers that refer to each other
+class Helper():
+    def __init__(self, name):
+        self.name = name
+        self.partner = None
+
+
+class PartnersGame(WaitingGame):
+    def initializeWorld(self):
+        self.left, self.right = Helper("left"), Helper("right")
+        self.left.partner, self.right.partner = self.right, self.left
+        return WaitingGame.initializeWorld(self)
+
+
+def test_fingerprint_of_instances_that_refer_to_each_other():
+    game, other = PartnersGame(randomSeed=0), PartnersGame(randomSeed=0)
+    assert game.stateFingerprint() == other.stateFingerprint()
+
+    other.right.name = "middle"
+    assert game.stateFingerprint() != other.stateFingerprint()
@@ -0,0 +1,112 @@
+import random
+
+from data.library.GameBasic import GameObject, World, TextGame
+
+
+# A game that keeps a log, counts and notes of its own (one of them nested), and writes into a list nested in a
+# property
+class DiaryGame(TextGame):
+    def __init__(self, randomSeed):
+        self.log = []
+        self.counts = {}
+        self.notes = {"all": [], "tags": set()}
+        TextGame.__init__(self, randomSeed)
+
+    def initializeWorld(self):
+        world = World("study")
+        self.diary = GameObject("diary")
+        self.diary.properties["pages"] = [["first page"]]
+        world.addObject(self.diary)
+        return world
+
+    def generatePossibleActions(self):
+        self.possibleActions = {"write": [["write"]], "turn page": [["turn page"]]}
+        return self.possibleActions
+
+    def step(self, actionStr):
+        self.log.append(actionStr)
+        self.counts[actionStr] = self.counts.get(actionStr, 0) + 1
+        self.notes["all"].append(actionStr)
+        self.notes["tags"].add(actionStr.split()[0])
+        pages = self.diary.properties["pages"]
+        if actionStr == "write":
+            pages[-1].append("more")
+        else:
+            pages.append([])
+        self.numSteps += 1
+        return (self.observationStr, self.score, 0, self.gameOver, self.gameWon)
+
+
+def test_undo_restores_containers_changed_in_place():
+    game = DiaryGame(randomSeed=0)
+    fingerprints = [game.stateFingerprint()]
+    game.setJournaling(True)
+    for action in ["write", "turn page", "write", "write"]:
+        game.step(action)
+        fingerprints.append(game.stateFingerprint())
+    assert len(set(fingerprints)) == len(fingerprints)
+
+    for fingerprint in reversed(fingerprints[:-1]):
+        assert game.undo()
+        assert game.stateFingerprint() == fingerprint
+    assert game.log == [] and game.counts == {} and game.notes == {"all": [], "tags": set()}
+    assert game.diary.properties["pages"] == [["first page"]]
+    assert not game.undo()
+
+
+# Plain (non game object) helpers, held by the game and by a game object, and a random number generator of its own
+class Helper():
+    def __init__(self):
+        self.pressed = False
+        self.history = []
+
+
+class PanelGame(TextGame):
+    def __init__(self, randomSeed, neighbour=None):
+        self.helper = Helper()
+        self.dice = random.Random(1)
+        self.neighbour = neighbour          # A game object of another game, which presses change too
+        TextGame.__init__(self, randomSeed)
+
+    def initializeWorld(self):
+        world = World("control room")
+        self.panel = GameObject("panel")
+        self.panel.switch = Helper()
+        world.addObject(self.panel)
+        return world
+
+    def generatePossibleActions(self):
+        self.possibleActions = {"press": [["press"]]}
+        return self.possibleActions
+
+    def step(self, actionStr):
+        self.helper.pressed = True
+        self.helper.history.append(self.dice.randint(1, 6))
+        self.panel.switch.pressed = not self.panel.switch.pressed
+        if self.neighbour is not None:
+            self.neighbour.pressCount = getattr(self.neighbour, "pressCount", 0) + 1
+        self.numSteps += 1
+        return (self.observationStr, self.score, 0, self.gameOver, self.gameWon)
+
+
+def test_undo_restores_helper_objects():
+    game = PanelGame(randomSeed=0)
+    fingerprint = game.stateFingerprint()
+    game.setJournaling(True)
+    game.step("press")
+    rolls = list(game.helper.history)
+
+    assert game.undo()
+    assert game.stateFingerprint() == fingerprint
+    assert (game.helper.pressed, game.helper.history, game.panel.switch.pressed) == (False, [], False)
+    game.step("press")
+    assert game.helper.history == rolls
+
+
+def test_undo_leaves_other_games_alone():
+    other = PanelGame(randomSeed=0)
+    game = PanelGame(randomSeed=0, neighbour=other.panel)
+    game.setJournaling(True)
+    game.step("press")
+    assert game.undo()
+    assert other.panel.pressCount == 1
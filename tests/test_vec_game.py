@@ -0,0 +1,59 @@
+import os
+import random
+
+from helpers import GAMES_FOLDER, REFACTORED_PROGRAMS_FOLDER, import_bytes32_module, load_game_class
+
+vec_game = import_bytes32_module("bytes32.vec_game")
+
+GAME_CLASSES = [load_game_class(os.path.join(REFACTORED_PROGRAMS_FOLDER, "boil-water.py")),
+                load_game_class(os.path.join(REFACTORED_PROGRAMS_FOLDER, "plant-tree.py")),
+                load_game_class(os.path.join(GAMES_FOLDER, "combination_lock.py"))]
+
+
+def step_game(game, action):
+    """ Take a step of a single game, as VecTextGame does (an exception ends the game) """
+    try:
+        return game.step(action)
+    except Exception as e:
+        return f"ERROR: {e}", game.score, 0, True, False
+
+
+def test_step_batch_matches_single_games():
+    seeds = [0, 1, 2]
+    env = vec_game.VecTextGame(GAME_CLASSES, seeds)
+    games = [game_class(randomSeed=seed) for game_class, seed in zip(GAME_CLASSES, seeds)]
+    assert env.reset_all() == [game.observationStr for game in games]
+
+    rng = random.Random(0)
+    num_ended = 0
+    for _ in range(60):
+        possible_actions = env.get_possible_actions()
+        actions = []
+        for game, env_actions in zip(games, possible_actions):
+            assert sorted(env_actions) == sorted(game.generatePossibleActions())
+            actions.append(rng.choice(sorted(env_actions)))
+
+        results = list(zip(*env.step_batch(actions)))
+        for idx, (game, action) in enumerate(zip(games, actions)):
+            expected = step_game(game, action)
+            assert results[idx] == tuple(expected)
+            if expected[3]:
+                # The environment starts the game over, as a new game would
+                num_ended += 1
+                games[idx] = GAME_CLASSES[idx](randomSeed=seeds[idx])
+                assert env.games[idx].stateFingerprint() == games[idx].stateFingerprint()
+                assert env.observations[idx] == games[idx].observationStr
+
+    assert num_ended > 0
+    assert env.get_throughput()["episodes"] == num_ended
+
+
+def test_ended_games_stay_ended_without_auto_reset():
+    env = vec_game.VecTextGame(GAME_CLASSES[2:], auto_reset=False)
+    env.reset_all()
+    observations, scores, _, dones, wons = env.step_batch(["open lock"])
+    assert (dones, wons) == ([True], [False])
+    assert env.step_batch(["turn dial"]) == (observations, scores, [0], [True], [False])
+
+    env.reset_all()
+    assert env.step_batch(["turn dial"])[0] == ["The dial shows 1."]